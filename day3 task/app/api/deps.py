@@ -3,12 +3,33 @@ from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
 from bson import ObjectId
 
+from app.core.cache import principal_cache, token_cache, token_digest
 from app.core.database import get_db
-from app.core.config import JWT_SECRET, JWT_ALGORITHM
-from app.models.user import user_helper
+from app.core.config import get_settings
+from app.models.user import principal_from_claims, user_helper
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/token")
 
+def decode_token(token: str):
+    """Verified claims for ``token``, or ``None`` if it is invalid.
+
+    Signature checks are skipped for tokens already verified; cached claims
+    expire together with the token.
+    """
+    digest = token_digest(token)
+    claims = token_cache.get(digest)
+    if claims is not None:
+        return claims
+
+    settings = get_settings()
+    try:
+        claims = jwt.decode(token, settings.jwt_secret, algorithms=[settings.jwt_algorithm])
+    except JWTError:
+        return None
+
+    token_cache.set(digest, claims, expires_at=claims.get("exp"))
+    return claims
+
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
     db = Depends(get_db)
@@ -18,16 +39,33 @@ async def get_current_user(
         detail="Invalid authentication credentials",
     )
 
-    try:
-        payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-    except JWTError:
+    payload = decode_token(token)
+    if payload is None:
+        raise credentials_exception
+    user_id: str = payload.get("sub")
+    if user_id is None:
         raise credentials_exception
 
+    principal = principal_from_claims(payload)
+    if principal is not None:
+        return principal
+
+    principal = principal_cache.get(user_id)
+    if principal is not None:
+        return principal
+
     user = await db.users.find_one({"_id": ObjectId(user_id)})
     if user is None:
         raise credentials_exception
 
-    return user_helper(user)
+    principal = user_helper(user)
+    principal_cache.set(user_id, principal, expires_at=payload.get("exp"))
+    return principal
+
+async def get_current_admin(current_user = Depends(get_current_user)):
+    if current_user["email"].lower() not in get_settings().admin_emails:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Administrator access required",
+        )
+    return current_user
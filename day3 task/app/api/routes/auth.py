@@ -1,9 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 
+from app.core.config import get_settings
 from app.core.database import get_db
 from app.core.security import create_access_token
 from app.crud.user import authenticate_user
+from app.models.user import token_claims
 from app.schemas.token import Token
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
@@ -13,9 +15,13 @@ async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
     db = Depends(get_db)
 ):
-    user = await authenticate_user(db, form_data.username, form_data.password)
+    embed_principal = get_settings().embed_principal_claims
+    user = await authenticate_user(
+        db, form_data.username, form_data.password, include_email=embed_principal
+    )
     if not user:
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
-    token = create_access_token({"sub": str(user["_id"])})
+    claims = token_claims(user, embed_principal)
+    token = create_access_token(claims)
     return {"access_token": token, "token_type": "bearer"}
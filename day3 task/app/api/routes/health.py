@@ -0,0 +1,24 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from pymongo.errors import PyMongoError
+
+from app.core.database import ping, pool_stats
+
+router = APIRouter(tags=["Health"])
+
+@router.get("/health")
+async def health():
+    try:
+        ping_ms = await ping()
+    except PyMongoError as exc:
+        return JSONResponse(
+            status_code=503,
+            content={
+                "status": "unavailable",
+                "mongo": {"error": str(exc), "pool": pool_stats.snapshot()},
+            },
+        )
+    return {
+        "status": "ok",
+        "mongo": {"ping_ms": ping_ms, "pool": pool_stats.snapshot()},
+    }
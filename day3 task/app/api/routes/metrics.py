@@ -0,0 +1,14 @@
+from fastapi import APIRouter
+
+from app.core.cache import principal_cache, token_cache
+from app.core.hashing import hasher
+
+router = APIRouter(tags=["Metrics"])
+
+@router.get("/metrics")
+async def read_metrics():
+    return {
+        "password_hashing": hasher.stats(),
+        "principal_cache": principal_cache.stats(),
+        "token_cache": token_cache.stats(),
+    }
@@ -1,11 +1,68 @@
-from fastapi import APIRouter, Depends, HTTPException
+import json
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import Response
+from starlette.requests import ClientDisconnect
+
 from app.schemas.user import UserCreate, UserResponse
-from app.crud.user import create_user
-from app.api.deps import get_current_user
+from app.crud.user import bulk_create_users, create_user
+from app.api.deps import get_current_admin, get_current_user
+from app.core.config import get_settings
 from app.core.database import get_db
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
+async def _iter_lines(chunks):
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line
+    if buffer:
+        yield buffer
+
+class _BulkResultsResponse(Response):
+    """Streams NDJSON results while reading the NDJSON request body.
+
+    StreamingResponse cannot do this: it listens for http.disconnect on the
+    same ``receive`` channel the body arrives on, so a handler reading
+    ``request.stream()`` from inside the response generator races it.
+    Here the response drives ``receive`` itself.
+    """
+
+    media_type = "application/x-ndjson"
+
+    def __init__(self, results):
+        super().__init__(media_type=self.media_type)
+        # No body is known up front, so no Content-Length.
+        self.raw_headers = [(b"content-type", self.media_type.encode("latin-1"))]
+        self._results = results
+
+    async def __call__(self, scope, receive, send):
+        async def body():
+            while True:
+                message = await receive()
+                if message["type"] == "http.disconnect":
+                    raise ClientDisconnect()
+                yield message.get("body", b"")
+                if not message.get("more_body", False):
+                    return
+
+        await send({
+            "type": "http.response.start",
+            "status": self.status_code,
+            "headers": self.raw_headers,
+        })
+        async for row in self._results(_iter_lines(body())):
+            await send({
+                "type": "http.response.body",
+                "body": (json.dumps(row) + "\n").encode("utf-8"),
+                "more_body": True,
+            })
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+
 @router.post("/", response_model=UserResponse)
 async def register(user: UserCreate, db = Depends(get_db)):
     created = await create_user(db, user)
@@ -13,6 +70,18 @@ async def register(user: UserCreate, db = Depends(get_db)):
         raise HTTPException(status_code=400, detail="Email already exists")
     return created
 
+@router.post("/bulk")
+async def bulk_register(
+    batch_size: Optional[int] = Query(None, ge=1, le=10000),
+    db = Depends(get_db),
+    _admin = Depends(get_current_admin),
+):
+    batch_size = batch_size or get_settings().bulk_batch_size
+
+    return _BulkResultsResponse(
+        lambda lines: bulk_create_users(db, lines, batch_size)
+    )
+
 @router.get("/me")
 async def read_me(current_user = Depends(get_current_user)):
     return current_user
@@ -0,0 +1,84 @@
+import hashlib
+import time
+from collections import OrderedDict
+
+
+class ExpiringLRUCache:
+    """Bounded LRU whose entries expire after ``ttl`` seconds or at an
+    explicit deadline, whichever comes first (``ttl=None`` means no cap).
+
+    Used for authenticated principals keyed by the JWT ``sub``, where code that
+    changes a user document must call ``invalidate`` so the next request
+    reloads it, and for verified token claims keyed by token digest.
+    """
+
+    def __init__(self, maxsize: int = 10000, ttl: int = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def configure(self, maxsize: int, ttl: int = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clear()
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        value, expires_at = entry
+        if time.time() >= expires_at:
+            del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key, value, expires_at=None):
+        if self.maxsize <= 0:
+            return
+
+        deadline = float("inf") if self.ttl is None else time.time() + self.ttl
+        if expires_at is not None:
+            deadline = min(deadline, float(expires_at))
+        if deadline == float("inf"):
+            return
+
+        self._entries[key] = (value, deadline)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key):
+        self._entries.pop(str(key), None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+        }
+
+
+def token_digest(token: str) -> bytes:
+    # Cache on a digest so raw bearer tokens are never kept in memory.
+    return hashlib.sha256(token.encode()).digest()
+
+
+principal_cache = ExpiringLRUCache(ttl=60)
+token_cache = ExpiringLRUCache()
@@ -1,19 +1,130 @@
 import os
-from dotenv import load_dotenv
+from dataclasses import dataclass
+from functools import lru_cache
 from urllib.parse import quote_plus
 
-load_dotenv()
+from dotenv import load_dotenv
+
+
+PASSWORD_SCHEMES = ("bcrypt", "argon2")
+
+
+class ConfigError(RuntimeError):
+    pass
+
+
+def _require(name: str) -> str:
+    value = os.getenv(name)
+    if not value:
+        raise ConfigError(f"Missing required environment variable {name}")
+    return value
+
+
+def _int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    if value is None or value == "":
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise ConfigError(f"{name} must be an integer, got {value!r}") from None
+
+
+def _bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None or value == "":
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _emails(name: str) -> frozenset:
+    value = os.getenv(name) or ""
+    return frozenset(email.strip().lower() for email in value.split(",") if email.strip())
+
+
+def _mongo_uri(db_name: str) -> str:
+    uri = os.getenv("MONGO_URI")
+    if uri:
+        return uri
+    username = _require("MONGO_USERNAME")
+    password = quote_plus(_require("MONGO_PASSWORD"))
+    cluster = _require("MONGO_CLUSTER")
+    return (
+        f"mongodb+srv://{username}:{password}"
+        f"@{cluster}/{db_name}?retryWrites=true&w=majority"
+    )
+
+
+@dataclass(frozen=True)
+class Settings:
+    mongo_uri: str
+    mongo_db_name: str
+    mongo_max_pool_size: int
+    mongo_min_pool_size: int
+    mongo_connect_timeout_ms: int
+    mongo_server_selection_timeout_ms: int
+    mongo_max_idle_time_ms: int
+
+    jwt_secret: str
+    jwt_algorithm: str
+    access_token_expire_minutes: int
+    embed_principal_claims: bool
+    token_cache_size: int
+
+    hash_workers: int
+    hash_max_pending: int
+    password_scheme: str
+    hash_target_ms: int
+    bcrypt_rounds: int
+    argon2_time_cost: int
+    argon2_memory_kib: int
+    argon2_parallelism: int
+
+    principal_cache_size: int
+    principal_cache_ttl_seconds: int
+
+    bulk_batch_size: int
+    admin_emails: frozenset
 
-MONGO_USERNAME = os.getenv("MONGO_USERNAME")
-MONGO_PASSWORD = quote_plus(os.getenv("MONGO_PASSWORD"))
-MONGO_CLUSTER = os.getenv("MONGO_CLUSTER")
-MONGO_DB_NAME = os.getenv("MONGO_DB_NAME")
 
-MONGO_URI = (
-    f"mongodb+srv://{MONGO_USERNAME}:{MONGO_PASSWORD}"
-    f"@{MONGO_CLUSTER}/{MONGO_DB_NAME}?retryWrites=true&w=majority"
-)
+@lru_cache
+def get_settings() -> Settings:
+    """Read configuration from the environment (and ``.env``) on first use.
 
-JWT_SECRET = os.getenv("JWT_SECRET")
-JWT_ALGORITHM = os.getenv("JWT_ALGORITHM")
-ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES"))
+    Nothing is parsed at import time, so importing the app never fails on a
+    missing variable; the first caller gets a ``ConfigError`` naming it.
+    """
+    load_dotenv()
+    db_name = _require("MONGO_DB_NAME")
+    password_scheme = (os.getenv("PASSWORD_SCHEME") or "bcrypt").lower()
+    if password_scheme not in PASSWORD_SCHEMES:
+        raise ConfigError(
+            f"PASSWORD_SCHEME must be one of {', '.join(PASSWORD_SCHEMES)}, "
+            f"got {password_scheme!r}"
+        )
+    return Settings(
+        mongo_uri=_mongo_uri(db_name),
+        mongo_db_name=db_name,
+        mongo_max_pool_size=_int("MONGO_MAX_POOL_SIZE", 100),
+        mongo_min_pool_size=_int("MONGO_MIN_POOL_SIZE", 0),
+        mongo_connect_timeout_ms=_int("MONGO_CONNECT_TIMEOUT_MS", 5000),
+        mongo_server_selection_timeout_ms=_int("MONGO_SERVER_SELECTION_TIMEOUT_MS", 5000),
+        mongo_max_idle_time_ms=_int("MONGO_MAX_IDLE_TIME_MS", 0),
+        jwt_secret=_require("JWT_SECRET"),
+        jwt_algorithm=os.getenv("JWT_ALGORITHM") or "HS256",
+        access_token_expire_minutes=_int("ACCESS_TOKEN_EXPIRE_MINUTES", 30),
+        embed_principal_claims=_bool("EMBED_PRINCIPAL_CLAIMS", False),
+        token_cache_size=_int("TOKEN_CACHE_SIZE", 10000),
+        hash_workers=_int("HASH_WORKERS", os.cpu_count() or 1),
+        hash_max_pending=_int("HASH_MAX_PENDING", 64),
+        password_scheme=password_scheme,
+        hash_target_ms=_int("HASH_TARGET_MS", 0),
+        bcrypt_rounds=_int("BCRYPT_ROUNDS", 0),
+        argon2_time_cost=_int("ARGON2_TIME_COST", 0),
+        argon2_memory_kib=_int("ARGON2_MEMORY_KIB", 0),
+        argon2_parallelism=_int("ARGON2_PARALLELISM", 0),
+        principal_cache_size=_int("PRINCIPAL_CACHE_SIZE", 10000),
+        principal_cache_ttl_seconds=_int("PRINCIPAL_CACHE_TTL_SECONDS", 60),
+        bulk_batch_size=_int("BULK_BATCH_SIZE", 500),
+        admin_emails=_emails("ADMIN_EMAILS"),
+    )
@@ -1,8 +1,122 @@
+import asyncio
+import threading
+import time
+
 from motor.motor_asyncio import AsyncIOMotorClient
-from app.core.config import MONGO_URI, MONGO_DB_NAME
+from pymongo import monitoring
+
+client = None
+db = None
+
+
+class PoolStats(monitoring.ConnectionPoolListener):
+    """Connection pool counters fed by pymongo's CMAP events."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.open = 0
+        self.in_use = 0
+        self.waiting = 0
+        self.checkout_failures = 0
+        self.max_pool_size = None
+
+    def _add(self, **deltas):
+        with self._lock:
+            for name, delta in deltas.items():
+                setattr(self, name, getattr(self, name) + delta)
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        self._add(open=1)
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._add(open=-1)
 
-client = AsyncIOMotorClient(MONGO_URI)
-db = client[MONGO_DB_NAME]
+    def connection_check_out_started(self, event):
+        self._add(waiting=1)
+
+    def connection_check_out_failed(self, event):
+        self._add(waiting=-1, checkout_failures=1)
+
+    def connection_checked_out(self, event):
+        self._add(waiting=-1, in_use=1)
+
+    def connection_checked_in(self, event):
+        self._add(in_use=-1)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            utilization = None
+            if self.max_pool_size:
+                utilization = round(self.in_use / self.max_pool_size, 4)
+            return {
+                "max_pool_size": self.max_pool_size,
+                "open": self.open,
+                "in_use": self.in_use,
+                "waiting": self.waiting,
+                "checkout_failures": self.checkout_failures,
+                "utilization": utilization,
+            }
+
+
+pool_stats = PoolStats()
 
 def get_db():
     return db
+
+async def connect(settings, mongo_client=None):
+    global client, db
+    if mongo_client is not None:
+        client = mongo_client
+        db = client[settings.mongo_db_name]
+        return
+
+    pool_stats.max_pool_size = settings.mongo_max_pool_size
+    client = AsyncIOMotorClient(
+        settings.mongo_uri,
+        maxPoolSize=settings.mongo_max_pool_size,
+        minPoolSize=settings.mongo_min_pool_size,
+        connectTimeoutMS=settings.mongo_connect_timeout_ms,
+        serverSelectionTimeoutMS=settings.mongo_server_selection_timeout_ms,
+        maxIdleTimeMS=settings.mongo_max_idle_time_ms or None,
+        event_listeners=[pool_stats],
+    )
+    db = client[settings.mongo_db_name]
+    await warmup(settings.mongo_min_pool_size)
+
+async def warmup(connections: int):
+    # Concurrent pings force the driver to open (and authenticate) that many
+    # sockets up front instead of on the first requests after startup.
+    await asyncio.gather(
+        *(client.admin.command("ping") for _ in range(max(1, connections)))
+    )
+
+async def ping() -> float:
+    started = time.perf_counter()
+    await client.admin.command("ping")
+    return round((time.perf_counter() - started) * 1000, 2)
+
+def close():
+    global client, db
+    if client is not None:
+        client.close()
+    client = None
+    db = None
+
+async def ensure_indexes(db):
+    # users: email lookups on login/registration, uniqueness enforced by Mongo
+    await db.users.create_index("email", unique=True, name="uniq_email")
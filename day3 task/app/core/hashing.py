@@ -0,0 +1,149 @@
+import asyncio
+import multiprocessing
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from app.core.security import (
+    configure_context,
+    hash_password,
+    hash_passwords,
+    verify_and_update,
+    verify_password,
+)
+
+
+BULK_CHUNK = 4  # passwords per bulk job
+
+
+class HashQueueFull(Exception):
+    pass
+
+
+class PasswordHasher:
+    """Runs password hashing in a process pool so hashing never blocks the event loop.
+
+    At most ``max_pending`` jobs may be in flight; beyond that callers get
+    ``HashQueueFull`` immediately instead of queueing behind a login burst.
+    Bulk hashing runs as small jobs on at most ``bulk_slots`` workers, so one
+    worker is always left for interactive logins and registrations.
+    """
+
+    def __init__(self, workers: int = 1, max_pending: int = 64, window: int = 1024):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor = None
+        self._pending = 0
+        self._completed = 0
+        self._rejected = 0
+        self._rehashed = 0
+        self._latencies = deque(maxlen=window)
+        self._bulk = asyncio.Semaphore(self.bulk_slots)
+        self.scheme = "bcrypt"
+        self.params = {}
+
+    @property
+    def bulk_slots(self) -> int:
+        return max(1, min(self.workers - 1, self.max_pending - 1))
+
+    def configure(self, workers: int, max_pending: int, scheme: str = "bcrypt",
+                  params: dict = None):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.scheme = scheme
+        self.params = dict(params or {})
+        self._bulk = asyncio.Semaphore(self.bulk_slots)
+        configure_context(self.scheme, self.params)
+
+    def start(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=configure_context,
+                initargs=(self.scheme, self.params),
+            )
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def _admit(self, jobs: int = 1):
+        if self._pending + jobs > self.max_pending:
+            self._rejected += 1
+            raise HashQueueFull()
+        self.start()
+        self._pending += jobs
+
+    async def _execute(self, fn, *args):
+        # The caller has already admitted this job via _admit().
+        started = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, fn, *args)
+        finally:
+            self._pending -= 1
+            self._completed += 1
+            self._latencies.append(time.perf_counter() - started)
+
+    async def _run(self, fn, *args):
+        self._admit()
+        return await self._execute(fn, *args)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(hash_password, password)
+
+    async def verify(self, plain: str, hashed: str) -> bool:
+        return await self._run(verify_password, plain, hashed)
+
+    async def verify_and_update(self, plain: str, hashed: str):
+        valid, new_hash = await self._run(verify_and_update, plain, hashed)
+        if new_hash is not None:
+            self._rehashed += 1
+        return valid, new_hash
+
+    async def _run_bulk(self, passwords: list) -> list:
+        async with self._bulk:
+            # Unlike interactive callers, bulk jobs wait for room in the queue
+            # rather than being rejected.
+            while self._pending >= self.max_pending:
+                await asyncio.sleep(0.05)
+            self._admit()
+            return await self._execute(hash_passwords, passwords)
+
+    async def hash_many(self, passwords: list) -> list:
+        chunks = [passwords[i:i + BULK_CHUNK] for i in range(0, len(passwords), BULK_CHUNK)]
+        results = await asyncio.gather(*(self._run_bulk(part) for part in chunks))
+        return [hashed for part in results for hashed in part]
+
+    def stats(self) -> dict:
+        samples = sorted(self._latencies)
+
+        def percentile(p):
+            if not samples:
+                return None
+            index = min(len(samples) - 1, int(p * len(samples)))
+            return round(samples[index] * 1000, 2)
+
+        return {
+            "scheme": self.scheme,
+            "params": self.params,
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "bulk_slots": self.bulk_slots,
+            "in_flight": self._pending,
+            "queue_depth": max(0, self._pending - self.workers),
+            "completed": self._completed,
+            "rejected": self._rejected,
+            "rehashed": self._rehashed,
+            "latency_ms": {
+                "p50": percentile(0.50),
+                "p95": percentile(0.95),
+                "p99": percentile(0.99),
+                "max": percentile(1.0),
+            },
+        }
+
+
+hasher = PasswordHasher()
@@ -1,18 +1,124 @@
+import argparse
+import statistics
+import time
 from datetime import datetime, timedelta
 from jose import jwt
 from passlib.context import CryptContext
-from app.core.config import JWT_SECRET, JWT_ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES
+from app.core.config import get_settings
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# The cost parameter passlib treats as "rounds" for each scheme.
+ROUNDS_PARAM = {"bcrypt": "rounds", "argon2": "time_cost"}
+
+def build_context(scheme: str, params: dict) -> CryptContext:
+    # Older bcrypt hashes stay verifiable after switching to argon2; they are
+    # flagged by needs_update and rehashed on the next successful login.
+    schemes = ["argon2", "bcrypt"] if scheme == "argon2" else ["bcrypt"]
+    options = {}
+    for name, value in params.items():
+        if name == ROUNDS_PARAM[scheme]:
+            # A plain rounds setting also caps the cost. Set only the default
+            # and the floor, so hashes are upgraded but never downgraded and
+            # processes calibrated to different costs don't undo each other.
+            options[f"{scheme}__default_rounds"] = value
+            options[f"{scheme}__min_rounds"] = value
+        else:
+            options[f"{scheme}__{name}"] = value
+    return CryptContext(schemes=schemes, deprecated="auto", **options)
+
+def configure_context(scheme: str, params: dict):
+    """Swap the module context; also the process pool worker initializer."""
+    global pwd_context
+    pwd_context = build_context(scheme, params)
+
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
 
 def verify_password(plain: str, hashed: str) -> bool:
     return pwd_context.verify(plain, hashed)
 
+def verify_and_update(plain: str, hashed: str):
+    """Return ``(valid, new_hash)``; ``new_hash`` is set when ``hashed`` is stale."""
+    return pwd_context.verify_and_update(plain, hashed)
+
+def hash_passwords(passwords: list) -> list:
+    return [pwd_context.hash(password) for password in passwords]
+
+def _time_hash_ms(context: CryptContext, samples: int = 3) -> float:
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        context.hash("calibration-password")
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+def calibrate(scheme: str, target_ms: float, argon2_memory_kib: int = 65536) -> dict:
+    """Strongest cost parameters whose hash time stays within ``target_ms`` here."""
+    if scheme == "bcrypt":
+        best = 4
+        for rounds in range(4, 32):
+            context = build_context("bcrypt", {"rounds": rounds})
+            if _time_hash_ms(context) > target_ms:
+                break
+            best = rounds
+        return {"rounds": best}
+
+    # argon2: keep the memory cost (the main defence against GPUs) unless even
+    # a single pass is too slow, then raise passes until the target is hit.
+    memory_kib = argon2_memory_kib
+    params = {"time_cost": 1, "memory_cost": memory_kib, "parallelism": 1}
+    while memory_kib > 8192 and _time_hash_ms(build_context("argon2", params)) > target_ms:
+        memory_kib //= 2
+        params["memory_cost"] = memory_kib
+
+    for time_cost in range(2, 33):
+        candidate = {**params, "time_cost": time_cost}
+        if _time_hash_ms(build_context("argon2", candidate)) > target_ms:
+            break
+        params = candidate
+    return params
+
+def resolve_hash_params(settings) -> dict:
+    if settings.hash_target_ms:
+        return calibrate(
+            settings.password_scheme,
+            settings.hash_target_ms,
+            settings.argon2_memory_kib or 65536,
+        )
+    if settings.password_scheme == "bcrypt":
+        params = {"rounds": settings.bcrypt_rounds}
+    else:
+        params = {
+            "time_cost": settings.argon2_time_cost,
+            "memory_cost": settings.argon2_memory_kib,
+            "parallelism": settings.argon2_parallelism,
+        }
+    return {name: value for name, value in params.items() if value}
+
 def create_access_token(data: dict):
+    settings = get_settings()
     to_encode = data.copy()
-    expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    expire = datetime.utcnow() + timedelta(minutes=settings.access_token_expire_minutes)
     to_encode.update({"exp": expire})
-    return jwt.encode(to_encode, JWT_SECRET, algorithm=JWT_ALGORITHM)
+    return jwt.encode(to_encode, settings.jwt_secret, algorithm=settings.jwt_algorithm)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Print hash cost parameters that hit a target latency on this host."
+    )
+    parser.add_argument("--scheme", choices=["bcrypt", "argon2"], default="bcrypt")
+    parser.add_argument("--target-ms", type=float, default=250)
+    parser.add_argument("--argon2-memory-kib", type=int, default=65536)
+    args = parser.parse_args()
+
+    params = calibrate(args.scheme, args.target_ms, args.argon2_memory_kib)
+    context = build_context(args.scheme, params)
+    print(f"PASSWORD_SCHEME={args.scheme}")
+    if args.scheme == "bcrypt":
+        print(f"BCRYPT_ROUNDS={params['rounds']}")
+    else:
+        print(f"ARGON2_TIME_COST={params['time_cost']}")
+        print(f"ARGON2_MEMORY_KIB={params['memory_cost']}")
+        print(f"ARGON2_PARALLELISM={params['parallelism']}")
+    print(f"# measured {_time_hash_ms(context):.1f} ms per hash")
@@ -1,23 +1,94 @@
-from app.core.security import hash_password, verify_password
+import json
+
+from pydantic import ValidationError
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from app.core.cache import principal_cache
+from app.core.hashing import hasher
 from app.models.user import user_helper
+from app.schemas.user import UserCreate
 
-async def create_user(db, user):
-    existing = await db.users.find_one({"email": user.email})
-    if existing:
-        return None
+DUPLICATE_KEY = 11000
 
+async def create_user(db, user):
     new_user = {
         "email": user.email,
-        "hashed_password": hash_password(user.password),
+        "hashed_password": await hasher.hash(user.password),
     }
-    result = await db.users.insert_one(new_user)
-    created = await db.users.find_one({"_id": result.inserted_id})
-    return user_helper(created)
+    try:
+        await db.users.insert_one(new_user)
+    except DuplicateKeyError:
+        return None
+    # insert_one sets new_user["_id"], so no re-read is needed
+    return user_helper(new_user)
 
-async def authenticate_user(db, email: str, password: str):
-    user = await db.users.find_one({"email": email})
+async def authenticate_user(db, email: str, password: str, include_email: bool = False):
+    # email is only read back when it is embedded in the issued token.
+    projection = {"_id": 1, "hashed_password": 1}
+    if include_email:
+        projection["email"] = 1
+    user = await db.users.find_one({"email": email}, projection=projection)
     if not user:
         return None
-    if not verify_password(password, user["hashed_password"]):
+    valid, new_hash = await hasher.verify_and_update(password, user["hashed_password"])
+    if not valid:
         return None
+    if new_hash:
+        # Matching on the old hash makes concurrent logins rehash only once.
+        await db.users.update_one(
+            {"_id": user["_id"], "hashed_password": user["hashed_password"]},
+            {"$set": {"hashed_password": new_hash}},
+        )
+        principal_cache.invalidate(user["_id"])
     return user
+
+async def _insert_batch(db, batch):
+    hashes = await hasher.hash_many([user.password for _, user in batch])
+    docs = [
+        {"email": user.email, "hashed_password": hashed}
+        for (_, user), hashed in zip(batch, hashes)
+    ]
+
+    failed = {}
+    try:
+        await db.users.insert_many(docs, ordered=False)
+    except BulkWriteError as exc:
+        failed = {err["index"]: err for err in exc.details.get("writeErrors", [])}
+
+    for index, ((line_no, user), doc) in enumerate(zip(batch, docs)):
+        error = failed.get(index)
+        if error is None:
+            yield {"line": line_no, "status": "created", **user_helper(doc)}
+        elif error.get("code") == DUPLICATE_KEY:
+            yield {"line": line_no, "status": "duplicate", "email": user.email}
+        else:
+            yield {"line": line_no, "status": "error", "email": user.email,
+                   "error": error.get("errmsg")}
+
+async def bulk_create_users(db, lines, batch_size: int):
+    """Create users from an async iterable of NDJSON lines.
+
+    Yields one result dict per non-blank line (created, duplicate, invalid or
+    error) as each batch is written, so only ``batch_size`` rows are held in
+    memory at a time.
+    """
+    batch = []
+    line_no = 0
+    async for line in lines:
+        line_no += 1
+        if not line.strip():
+            continue
+        try:
+            batch.append((line_no, UserCreate(**json.loads(line))))
+        except (ValueError, TypeError, ValidationError) as exc:
+            yield {"line": line_no, "status": "invalid", "error": str(exc)}
+            continue
+
+        if len(batch) >= batch_size:
+            async for result in _insert_batch(db, batch):
+                yield result
+            batch = []
+
+    if batch:
+        async for result in _insert_batch(db, batch):
+            yield result
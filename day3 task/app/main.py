@@ -1,7 +1,66 @@
-from fastapi import FastAPI
-from app.api.routes import auth, user
+import asyncio
+import logging
+from contextlib import asynccontextmanager
 
-app = FastAPI(title="FastAPI MongoDB OAuth2")
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 
-app.include_router(auth.router)
-app.include_router(user.router)
+from app.api.routes import auth, health, metrics, user
+from app.core import database
+from app.core.cache import principal_cache, token_cache
+from app.core.config import get_settings
+from app.core.hashing import HashQueueFull, hasher
+from app.core.security import resolve_hash_params
+
+logger = logging.getLogger(__name__)
+
+
+def create_app(mongo_client=None) -> FastAPI:
+    """Build the application.
+
+    ``mongo_client`` replaces the Motor client built from settings, e.g. an
+    in-memory stand-in for benchmarks.
+    """
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        settings = get_settings()
+        principal_cache.configure(
+            settings.principal_cache_size, settings.principal_cache_ttl_seconds
+        )
+        token_cache.configure(settings.token_cache_size)
+        # Calibration hashes for a few seconds; keep it off the event loop.
+        hash_params = await asyncio.to_thread(resolve_hash_params, settings)
+        logger.info("password hashing: %s %s", settings.password_scheme, hash_params)
+        hasher.configure(
+            settings.hash_workers,
+            settings.hash_max_pending,
+            settings.password_scheme,
+            hash_params,
+        )
+
+        await database.connect(settings, mongo_client=mongo_client)
+        await database.ensure_indexes(database.get_db())
+        hasher.start()
+        yield
+        hasher.shutdown()
+        database.close()
+
+    app = FastAPI(title="FastAPI MongoDB OAuth2", lifespan=lifespan)
+
+    @app.exception_handler(HashQueueFull)
+    async def hash_queue_full_handler(request: Request, exc: HashQueueFull):
+        return JSONResponse(
+            status_code=503,
+            content={"detail": "Authentication service busy, retry shortly"},
+            headers={"Retry-After": "1"},
+        )
+
+    app.include_router(auth.router)
+    app.include_router(user.router)
+    app.include_router(metrics.router)
+    app.include_router(health.router)
+    return app
+
+
+app = create_app()
@@ -3,3 +3,15 @@ def user_helper(user) -> dict:
         "id": str(user["_id"]),
         "email": user["email"],
     }
+
+def token_claims(user, embed_principal: bool = False) -> dict:
+    claims = {"sub": str(user["_id"])}
+    if embed_principal:
+        claims["email"] = user["email"]
+    return claims
+
+def principal_from_claims(claims) -> dict:
+    # Only tokens issued with embedded principal fields carry "email".
+    if "email" not in claims:
+        return None
+    return {"id": claims["sub"], "email": claims["email"]}
@@ -0,0 +1,55 @@
+"""
+Per-request cost of resolving a bearer token: full jose decode vs the
+verified-token cache in app.api.deps.decode_token.
+
+    python -m benchmarks.jwt_decode --iterations 20000
+"""
+
+import argparse
+import os
+import timeit
+
+for key, value in {
+    "MONGO_URI": "mongodb://benchmark",
+    "MONGO_DB_NAME": "benchmark",
+    "JWT_SECRET": "benchmark-secret",
+}.items():
+    os.environ.setdefault(key, value)
+
+from jose import jwt
+
+from app.api.deps import decode_token
+from app.core.cache import token_cache
+from app.core.config import get_settings
+from app.core.security import create_access_token
+
+
+def report(label, seconds, iterations):
+    per_call = seconds / iterations * 1e6
+    print(f"{label:<24} {per_call:9.2f} us/request  {iterations / seconds:12.0f} req/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    settings = get_settings()
+    token = create_access_token({"sub": "507f1f77bcf86cd799439011", "email": "bench@example.com"})
+
+    full = timeit.timeit(
+        lambda: jwt.decode(token, settings.jwt_secret, algorithms=[settings.jwt_algorithm]),
+        number=args.iterations,
+    )
+    report("jose.jwt.decode", full, args.iterations)
+
+    token_cache.clear()
+    decode_token(token)
+    cached = timeit.timeit(lambda: decode_token(token), number=args.iterations)
+    report("decode_token (cached)", cached, args.iterations)
+
+    print(f"speedup: {full / cached:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""
+Latency benchmark for the auth service hot paths.
+
+Boots the app in-process against mongomock-motor (no MongoDB needed) and
+drives POST /users/, POST /auth/token and GET /users/me at a fixed
+concurrency. Prints throughput and p50/p95/p99 per route and writes the
+results as JSON so runs can be compared across commits.
+
+    python -m benchmarks.load --users 200 --concurrency 20 --output bench.json
+    python -m benchmarks.load --baseline bench.json --threshold 0.15
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+for key, value in {
+    "MONGO_URI": "mongodb://benchmark",
+    "MONGO_DB_NAME": "benchmark",
+    "JWT_SECRET": "benchmark-secret",
+}.items():
+    os.environ.setdefault(key, value)
+
+import httpx
+from mongomock_motor import AsyncMongoMockClient
+
+from app.main import create_app
+
+
+def percentile(samples, p):
+    if not samples:
+        return None
+    index = min(len(samples) - 1, int(p * len(samples)))
+    return round(samples[index] * 1000, 3)
+
+
+def summarize(latencies, errors, elapsed):
+    samples = sorted(latencies)
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "throughput_rps": round(len(samples) / elapsed, 2) if elapsed else None,
+        "p50_ms": percentile(samples, 0.50),
+        "p95_ms": percentile(samples, 0.95),
+        "p99_ms": percentile(samples, 0.99),
+        "max_ms": percentile(samples, 1.0),
+    }
+
+
+async def drive(jobs, concurrency):
+    """Run ``jobs`` (zero-arg coroutine factories) ``concurrency`` at a time."""
+    latencies = []
+    errors = 0
+    results = []
+    pending = iter(jobs)
+
+    async def worker():
+        nonlocal errors
+        for job in pending:
+            started = time.perf_counter()
+            response = await job()
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+            results.append(response)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - started), results
+
+
+async def run(args):
+    app = create_app(mongo_client=AsyncMongoMockClient())
+    transport = httpx.ASGITransport(app=app)
+    credentials = [
+        {"email": f"user{i}@bench.example.com", "password": f"password-{i}"}
+        for i in range(args.users)
+    ]
+    routes = {}
+
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            routes["POST /users/"], _ = await drive(
+                [lambda c=c: client.post("/users/", json=c) for c in credentials],
+                args.concurrency,
+            )
+
+            form = [{"username": c["email"], "password": c["password"]} for c in credentials]
+            routes["POST /auth/token"], responses = await drive(
+                [lambda f=f: client.post("/auth/token", data=f) for f in form],
+                args.concurrency,
+            )
+            tokens = [r.json()["access_token"] for r in responses if r.status_code == 200]
+            if not tokens:
+                sys.exit("no successful logins; cannot benchmark /users/me")
+
+            headers = [
+                {"Authorization": f"Bearer {tokens[i % len(tokens)]}"}
+                for i in range(args.requests)
+            ]
+            routes["GET /users/me"], _ = await drive(
+                [lambda h=h: client.get("/users/me", headers=h) for h in headers],
+                args.concurrency,
+            )
+
+    return routes
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current, baseline, threshold):
+    """Return the routes whose p95 grew by more than ``threshold``."""
+    regressions = []
+    for route, stats in current["routes"].items():
+        before = baseline.get("routes", {}).get(route)
+        if not before or not before.get("p95_ms") or stats["p95_ms"] is None:
+            continue
+        change = stats["p95_ms"] / before["p95_ms"] - 1
+        if change > threshold:
+            regressions.append((route, before["p95_ms"], stats["p95_ms"], change))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=200, help="users to register and log in")
+    parser.add_argument("--requests", type=int, default=5000, help="GET /users/me requests")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--output", help="write results JSON here")
+    parser.add_argument("--baseline", help="results JSON from an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.15,
+                        help="allowed relative p95 increase before flagging a regression")
+    args = parser.parse_args()
+
+    routes = asyncio.run(run(args))
+    result = {
+        "meta": {
+            "revision": git_revision(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "users": args.users,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "hash_workers": os.getenv("HASH_WORKERS"),
+        },
+        "routes": routes,
+    }
+
+    print(f"{'route':<18} {'rps':>9} {'p50':>9} {'p95':>9} {'p99':>9} {'errors':>7}")
+    for route, stats in routes.items():
+        print(
+            f"{route:<18} {stats['throughput_rps']:>9} {stats['p50_ms']:>9} "
+            f"{stats['p95_ms']:>9} {stats['p99_ms']:>9} {stats['errors']:>7}"
+        )
+
+    if args.output:
+        with open(args.output, "w") as fp:
+            json.dump(result, fp, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as fp:
+            regressions = compare(result, json.load(fp), args.threshold)
+        for route, before, after, change in regressions:
+            print(f"REGRESSION {route}: p95 {before}ms -> {after}ms (+{change:.0%})")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Requests/sec for GET /users/me with and without the principal cache.
+
+Mongo is replaced by an in-process collection that sleeps for a fixed
+round-trip latency, so the numbers isolate what the cache saves.
+
+    python -m benchmarks.principal_cache --requests 5000 --concurrency 50 --db-latency-ms 2
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+for key, value in {
+    "MONGO_USERNAME": "bench",
+    "MONGO_PASSWORD": "bench",
+    "MONGO_CLUSTER": "localhost",
+    "MONGO_DB_NAME": "bench",
+    "JWT_SECRET": "bench-secret",
+    "JWT_ALGORITHM": "HS256",
+    "ACCESS_TOKEN_EXPIRE_MINUTES": "30",
+}.items():
+    os.environ.setdefault(key, value)
+
+import httpx
+from bson import ObjectId
+
+from app.core.cache import principal_cache
+from app.core.database import get_db
+from app.core.security import create_access_token
+from app.main import app
+
+
+class SlowUsers:
+    def __init__(self, docs, latency):
+        self.docs = {doc["_id"]: doc for doc in docs}
+        self.latency = latency
+        self.queries = 0
+
+    async def find_one(self, query):
+        self.queries += 1
+        await asyncio.sleep(self.latency)
+        return self.docs.get(query.get("_id"))
+
+
+class FakeDB:
+    def __init__(self, users):
+        self.users = users
+
+
+async def drive(client, token, total, concurrency):
+    headers = {"Authorization": f"Bearer {token}"}
+    remaining = iter(range(total))
+
+    async def worker():
+        for _ in remaining:
+            response = await client.get("/users/me", headers=headers)
+            response.raise_for_status()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return time.perf_counter() - started
+
+
+async def run(args):
+    user_id = ObjectId()
+    users = SlowUsers(
+        [{"_id": user_id, "email": "bench@example.com", "hashed_password": "x"}],
+        args.db_latency_ms / 1000,
+    )
+    db = FakeDB(users)
+    app.dependency_overrides[get_db] = lambda: db
+    token = create_access_token({"sub": str(user_id)})
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for label, maxsize in (("without cache", 0), ("with cache", args.cache_size)):
+            principal_cache.clear()
+            principal_cache.maxsize = maxsize
+            users.queries = 0
+            elapsed = await drive(client, token, args.requests, args.concurrency)
+            print(
+                f"{label:>14}: {args.requests / elapsed:9.1f} req/s "
+                f"({elapsed:.2f}s, {users.queries} db lookups)"
+            )
+
+    print("cache stats:", principal_cache.stats())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--db-latency-ms", type=float, default=2.0)
+    parser.add_argument("--cache-size", type=int, default=10000)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""POST /users/bulk end to end through the ASGI app (mongomock-motor backed)."""
+
+import asyncio
+import json
+import os
+
+for key, value in {
+    "MONGO_URI": "mongodb://test",
+    "MONGO_DB_NAME": "test",
+    "JWT_SECRET": "test-secret",
+    "BCRYPT_ROUNDS": "4",
+    "HASH_WORKERS": "1",
+    "ADMIN_EMAILS": "admin@example.com",
+}.items():
+    os.environ.setdefault(key, value)
+
+import httpx
+from mongomock_motor import AsyncMongoMockClient
+
+from app.main import create_app
+
+BODY = b"\n".join([
+    b'{"email": "a@example.com", "password": "pw-a"}',
+    b'{"email": "b@example.com", "password": "pw-b"}',
+    b"",
+    b"not json",
+    b'{"email": "a@example.com", "password": "pw-a2"}',
+    b'{"email": "c@example.com", "password": "pw-c"}',
+]) + b"\n"
+
+EXPECTED = {1: "created", 2: "created", 4: "invalid", 5: "duplicate", 6: "created"}
+
+
+async def login(client, email):
+    await client.post("/users/", json={"email": email, "password": "pw"})
+    response = await client.post("/auth/token", data={"username": email, "password": "pw"})
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def post_bulk(content, email="admin@example.com"):
+    app = create_app(mongo_client=AsyncMongoMockClient())
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            headers = await login(client, email) if email else {}
+            response = await asyncio.wait_for(
+                client.post(
+                    "/users/bulk",
+                    params={"batch_size": 2},
+                    content=content,
+                    headers={"Content-Type": "application/x-ndjson", **headers},
+                ),
+                timeout=30,
+            )
+    return response
+
+
+def check(response):
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert {row["line"]: row["status"] for row in rows} == EXPECTED
+    created = {row["email"] for row in rows if row["status"] == "created"}
+    assert created == {"a@example.com", "b@example.com", "c@example.com"}
+
+
+def test_bulk_register_whole_body():
+    check(asyncio.run(post_bulk(BODY)))
+
+
+def test_bulk_register_chunked_body():
+    async def chunks():
+        # Split mid-line so lines straddle http.request messages.
+        for start in range(0, len(BODY), 7):
+            yield BODY[start:start + 7]
+
+    check(asyncio.run(post_bulk(chunks())))
+
+
+def test_bulk_register_requires_token():
+    assert asyncio.run(post_bulk(BODY, email=None)).status_code == 401
+
+
+def test_bulk_register_requires_admin():
+    assert asyncio.run(post_bulk(BODY, email="user@example.com")).status_code == 403
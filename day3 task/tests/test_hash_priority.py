@@ -0,0 +1,81 @@
+"""Interactive logins must not queue behind a running bulk import."""
+
+import asyncio
+import json
+import os
+import time
+
+for key, value in {
+    "MONGO_URI": "mongodb://test",
+    "MONGO_DB_NAME": "test",
+    "JWT_SECRET": "test-secret",
+    "ADMIN_EMAILS": "admin@example.com",
+}.items():
+    os.environ.setdefault(key, value)
+
+import httpx
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+
+from app.core.config import get_settings
+from app.core.hashing import hasher
+from app.main import create_app
+
+ROWS = 200
+
+
+@pytest.fixture
+def two_workers(monkeypatch):
+    # Enough rounds that the bulk import takes seconds, not milliseconds.
+    monkeypatch.setenv("BCRYPT_ROUNDS", "8")
+    monkeypatch.setenv("HASH_WORKERS", "2")
+    get_settings.cache_clear()
+    yield
+    get_settings.cache_clear()
+
+
+async def login_during_bulk():
+    app = create_app(mongo_client=AsyncMongoMockClient())
+    transport = httpx.ASGITransport(app=app)
+    body = "".join(
+        json.dumps({"email": f"bulk{i}@example.com", "password": f"pw-{i}"}) + "\n"
+        for i in range(ROWS)
+    ).encode()
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            # Registering two users at once also starts both worker processes.
+            await asyncio.gather(*(
+                client.post("/users/", json={"email": email, "password": "pw"})
+                for email in ("login@example.com", "admin@example.com")
+            ))
+            token = await client.post(
+                "/auth/token", data={"username": "admin@example.com", "password": "pw"}
+            )
+
+            bulk = asyncio.create_task(client.post(
+                "/users/bulk",
+                content=body,
+                headers={
+                    "Authorization": f"Bearer {token.json()['access_token']}",
+                    "Content-Type": "application/x-ndjson",
+                },
+                timeout=60,
+            ))
+            while hasher.stats()["in_flight"] == 0:
+                await asyncio.sleep(0.01)
+
+            started = time.perf_counter()
+            login = await client.post(
+                "/auth/token", data={"username": "login@example.com", "password": "pw"}
+            )
+            latency = time.perf_counter() - started
+            bulk_running = not bulk.done()
+            await bulk
+    return login, latency, bulk_running
+
+
+def test_login_is_not_queued_behind_bulk_import(two_workers):
+    login, latency, bulk_running = asyncio.run(login_during_bulk())
+    assert login.status_code == 200
+    assert bulk_running
+    assert latency < 0.5
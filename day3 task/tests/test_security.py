@@ -0,0 +1,13 @@
+"""Rehash policy of the password context built from configured cost parameters."""
+
+from app.core.security import build_context
+
+
+def test_bcrypt_hashes_are_upgraded_never_downgraded():
+    low, high = build_context("bcrypt", {"rounds": 4}), build_context("bcrypt", {"rounds": 5})
+    low_hash, high_hash = low.hash("pw"), high.hash("pw")
+
+    assert low_hash.startswith("$2b$04$") and high_hash.startswith("$2b$05$")
+    assert high.needs_update(low_hash)
+    assert not low.needs_update(high_hash)
+    assert not high.needs_update(high_hash)
@@ -0,0 +1,85 @@
+# ==========================================
+# Resolver latency vs. user count for ew.py
+# ==========================================
+# Runs the GraphQL schema in-process (no server) and times the id lookup,
+# update, and delete+create paths as the store grows. A list scan like the
+# original resolvers is timed alongside for comparison.
+#
+#   python bench_graphql_store.py --sizes 1000 10000 100000 --ops 2000
+
+import argparse
+import asyncio
+import random
+import time
+
+import ew
+
+USER_QUERY = "query ($id: Int!) { user(id: $id) { id name email } }"
+UPDATE_MUTATION = "mutation ($id: Int!) { updateUser(id: $id, name: \"renamed\") { id } }"
+CHURN_MUTATION = """
+mutation ($id: Int!, $email: String!) {
+  deleteUser(id: $id)
+  createUser(name: "new", email: $email) { id }
+}
+"""
+
+
+def fill(size):
+    ew.users = ew.UserStore(ew.User)
+    for i in range(size):
+        ew.users.create(name=f"user{i}", email=f"user{i}@example.com")
+
+
+async def time_operation(query, variables_for, ops):
+    started = time.perf_counter()
+    for i in range(ops):
+        result = await ew.schema.execute(
+            query,
+            variable_values=variables_for(i),
+            context_value=await ew.get_context(),
+        )
+        if result.errors:
+            raise RuntimeError(result.errors)
+    return (time.perf_counter() - started) / ops * 1e6
+
+
+def time_list_scan(size, ops):
+    snapshot = ew.users.all()
+    ids = [random.randint(1, size) for _ in range(ops)]
+    started = time.perf_counter()
+    for user_id in ids:
+        next((u for u in snapshot if u.id == user_id), None)
+    return (time.perf_counter() - started) / ops * 1e6
+
+
+async def run(sizes, ops):
+    print(f"{'users':>9} {'user(id)':>12} {'updateUser':>12} {'delete+create':>14} {'list scan':>12}  (us/op)")
+    for size in sizes:
+        fill(size)
+        lookup = await time_operation(
+            USER_QUERY, lambda i: {"id": random.randint(1, size)}, ops
+        )
+        update = await time_operation(
+            UPDATE_MUTATION, lambda i: {"id": random.randint(1, size)}, ops
+        )
+        live_ids = [u.id for u in ew.users.all()]
+        random.shuffle(live_ids)
+        churn = await time_operation(
+            CHURN_MUTATION,
+            lambda i: {"id": live_ids[i % len(live_ids)], "email": f"churn{size}-{i}@example.com"},
+            min(ops, size),
+        )
+        scan = time_list_scan(size, ops)
+        print(f"{size:>9} {lookup:>12.1f} {update:>12.1f} {churn:>14.1f} {scan:>12.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GraphQL resolver latency vs. user count")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--ops", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(run(args.sizes, args.ops))
+
+
+if __name__ == "__main__":
+    main()
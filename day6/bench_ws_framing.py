@@ -0,0 +1,130 @@
+# ==========================================
+# Wire size and throughput of ws.py framing modes
+# ==========================================
+# Offline: encodes a stream of broadcast payloads the way ws.py does for each
+# protocol and reports bytes on the wire per message (WebSocket header +
+# payload, with permessage-deflate simulated as a raw deflate stream with
+# context takeover) and encode throughput.
+# Live (--url): drives a running server with main.py's load generator once
+# per mode and reports received messages/sec.
+#
+#   python bench_ws_framing.py --messages 20000 --batch 16
+#   python bench_ws_framing.py --url ws://127.0.0.1:8000/ws/chat --connections 200
+
+import argparse
+import asyncio
+import json
+import random
+import time
+import zlib
+
+import main as loadgen
+import ws
+
+
+def frame_overhead(size):
+    # Server-to-client frames are unmasked.
+    if size < 126:
+        return 2
+    if size < 0x10000:
+        return 4
+    return 10
+
+
+def sample_payloads(count):
+    rooms = ["lobby", "telemetry", "support"]
+    payloads = []
+    for seq in range(count):
+        body = json.dumps({
+            "client": random.randint(1, 500),
+            "seq": seq,
+            "sent": time.perf_counter(),
+            "cpu": round(random.random(), 3),
+        })
+        payloads.append({
+            "room": random.choice(rooms),
+            "from": random.randint(1, 500),
+            "ts": time.time(),
+            "message": body,
+        })
+    return payloads
+
+
+def build_frames(codec, payloads, batch):
+    items = [codec.encode(p) for p in payloads]
+    if not codec.batched:
+        return items
+    return [codec.join(items[i:i + batch]) for i in range(0, len(items), batch)]
+
+
+def wire_bytes(frames, deflate):
+    total = 0
+    compressor = zlib.compressobj(wbits=-zlib.MAX_WBITS) if deflate else None
+    for frame in frames:
+        data = frame.encode() if isinstance(frame, str) else frame
+        if compressor is not None:
+            # permessage-deflate strips the trailing 00 00 ff ff of each flush.
+            data = (compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH))[:-4]
+        total += len(data) + frame_overhead(len(data))
+    return total
+
+
+def offline(args):
+    payloads = sample_payloads(args.messages)
+    codecs = [("text", ws.TEXT)] + [(name, codec) for name, codec in ws.CODECS.items()]
+
+    baseline = None
+    print(f"{'mode':<28} {'bytes/msg':>10} {'vs text':>8} {'encode msg/s':>14}")
+    for name, codec in codecs:
+        started = time.perf_counter()
+        frames = build_frames(codec, payloads, args.batch)
+        encode_rate = args.messages / (time.perf_counter() - started)
+        for deflate in (False, True):
+            size = wire_bytes(frames, deflate) / args.messages
+            if baseline is None:
+                baseline = size
+            label = f"{name}{' +deflate' if deflate else ''}"
+            print(f"{label:<28} {size:>10.1f} {size / baseline:>8.2f} {encode_rate:>14.0f}")
+
+
+def live(args):
+    modes = [("text", "none"), ("text", "deflate"), ("json-batch", "none"), ("json-batch", "deflate")]
+    if loadgen.msgpack is not None:
+        modes += [("msgpack", "none"), ("msgpack", "deflate")]
+
+    print(f"\n{'mode':<28} {'received msg/s':>15} {'rtt p95 ms':>11}")
+    for protocol, compression in modes:
+        run_args = argparse.Namespace(
+            url=args.url,
+            room=f"bench-{protocol}-{compression}",
+            connections=args.connections,
+            ramp_up=1,
+            rate=args.rate,
+            duration=args.duration,
+            drain=1,
+            connect_timeout=10,
+            protocol=protocol,
+            compression=compression,
+        )
+        result = asyncio.run(loadgen.run(run_args))
+        label = f"{protocol}{' +deflate' if compression == 'deflate' else ''}"
+        print(f"{label:<28} {result['received_per_s']:>15} {result['round_trip']['p95_ms']!s:>11}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare ws.py framing modes")
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--batch", type=int, default=16, help="messages per flush window for batched modes")
+    parser.add_argument("--url", help="also benchmark a running server")
+    parser.add_argument("--connections", type=int, default=100)
+    parser.add_argument("--rate", type=float, default=10)
+    parser.add_argument("--duration", type=float, default=10)
+    args = parser.parse_args()
+
+    offline(args)
+    if args.url:
+        live(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,29 @@
+import base64
+import binascii
+
 import strawberry
 from typing import List, Optional
 from fastapi import FastAPI
+from strawberry.dataloader import DataLoader
+from strawberry.extensions import (
+    AddValidationRules,
+    MaxAliasesLimiter,
+    ParserCache,
+    QueryDepthLimiter,
+    ValidationCache,
+)
 from strawberry.fastapi import GraphQLRouter
+from strawberry.types import Info
+
+from graphql_limits import PersistedQueries, complexity_limit
+from user_store import UserStore
+
+# Parsed/validated documents and persisted queries kept per process
+DOCUMENT_CACHE_SIZE = 1024
+MAX_QUERY_DEPTH = 8
+MAX_ALIASES = 20
+MAX_COMPLEXITY = 200
+MAX_PAGE_SIZE = 100
 
 # -------------------------
 # GraphQL Types
@@ -14,8 +36,41 @@ class User:
     email: str
 
 
-# In-memory database
-users: List[User] = []
+@strawberry.type
+class UserEdge:
+    cursor: str
+    node: User
+
+
+@strawberry.type
+class PageInfo:
+    has_next_page: bool
+    end_cursor: Optional[str]
+
+
+@strawberry.type
+class UserConnection:
+    edges: List[UserEdge]
+    page_info: PageInfo
+    total_count: int
+
+
+def encode_cursor(user_id: int) -> str:
+    return base64.urlsafe_b64encode(f"user:{user_id}".encode()).decode()
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        kind, _, value = base64.urlsafe_b64decode(cursor.encode()).decode().partition(":")
+        if kind != "user":
+            raise ValueError
+        return int(value)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError(f"Invalid cursor: {cursor}") from None
+
+
+# In-memory database: id and email indexes, ids never reused
+users: UserStore[User] = UserStore(User)
 
 
 # -------------------------
@@ -27,11 +82,33 @@ class Query:
 
     @strawberry.field
     def users(self) -> List[User]:
-        return users
+        return users.all()
+
+    @strawberry.field
+    def users_connection(
+        self, first: int = 20, after: Optional[str] = None
+    ) -> UserConnection:
+        if not 0 < first <= MAX_PAGE_SIZE:
+            raise ValueError(f"first must be between 1 and {MAX_PAGE_SIZE}")
+        after_id = decode_cursor(after) if after else None
+        page, has_next = users.page(after_id, first)
+        edges = [UserEdge(cursor=encode_cursor(u.id), node=u) for u in page]
+        return UserConnection(
+            edges=edges,
+            page_info=PageInfo(
+                has_next_page=has_next,
+                end_cursor=edges[-1].cursor if edges else None,
+            ),
+            total_count=len(users),
+        )
+
+    @strawberry.field
+    async def user(self, id: int, info: Info) -> Optional[User]:
+        return await info.context["user_loader"].load(id)
 
     @strawberry.field
-    def user(self, id: int) -> Optional[User]:
-        return next((u for u in users if u.id == id), None)
+    def user_by_email(self, email: str) -> Optional[User]:
+        return users.get_by_email(email)
 
     @strawberry.field
     def user_count(self) -> int:
@@ -55,32 +132,50 @@ class Mutation:
 
     @strawberry.field
     def create_user(self, name: str, email: str) -> User:
-        user = User(id=len(users) + 1, name=name, email=email)
-        users.append(user)
-        return user
+        return users.create(name=name, email=email)
 
     @strawberry.field
     def update_user(self, id: int, name: Optional[str] = None) -> User:
-        user = next(u for u in users if u.id == id)
-        if name:
-            user.name = name
+        user = users.update(id, name=name)
+        if user is None:
+            raise ValueError(f"User {id} not found")
         return user
 
     @strawberry.field
     def delete_user(self, id: int) -> bool:
-        global users
-        users = [u for u in users if u.id != id]
-        return True
+        return users.delete(id)
 
 
 # -------------------------
 # Schema + App
 # -------------------------
 
-schema = strawberry.Schema(query=Query, mutation=Mutation)
+async def load_users(ids: List[int]) -> List[Optional[User]]:
+    return users.get_many(ids)
+
+
+async def get_context():
+    # One loader per request: every user(id) in a document is batched into a
+    # single store lookup, and repeated ids are served from the loader cache.
+    return {"user_loader": DataLoader(load_fn=load_users)}
+
+
+schema = strawberry.Schema(
+    query=Query,
+    mutation=Mutation,
+    extensions=[
+        ParserCache(maxsize=DOCUMENT_CACHE_SIZE),
+        ValidationCache(maxsize=DOCUMENT_CACHE_SIZE),
+        QueryDepthLimiter(max_depth=MAX_QUERY_DEPTH),
+        MaxAliasesLimiter(max_alias_count=MAX_ALIASES),
+        AddValidationRules([complexity_limit(MAX_COMPLEXITY)]),
+    ],
+)
 
 app = FastAPI(title="GraphQL User API")
 
-graphql_app = GraphQLRouter(schema)
+graphql_app = GraphQLRouter(schema, context_getter=get_context)
 
 app.include_router(graphql_app, prefix="/graphql")
+
+app.add_middleware(PersistedQueries, path="/graphql", maxsize=DOCUMENT_CACHE_SIZE)
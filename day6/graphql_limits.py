@@ -0,0 +1,146 @@
+import hashlib
+import json
+from collections import OrderedDict
+
+from graphql import GraphQLError, get_nullable_type, is_list_type
+from graphql.validation import ValidationRule
+
+
+# -------------------------
+# Query complexity limit
+# -------------------------
+
+def complexity_limit(max_complexity: int, list_cost: int = 10):
+    """Validation rule rejecting documents whose estimated cost is too high.
+
+    Every selected field costs 1, fields returning lists cost ``list_cost``.
+    Runs during validation, so with a validation cache a document is only
+    scored once.
+    """
+
+    class ComplexityLimitRule(ValidationRule):
+        def __init__(self, context):
+            super().__init__(context)
+            self.cost = 0
+
+        def enter_field(self, node, *_):
+            field = self.context.get_field_def()
+            if field is not None and is_list_type(get_nullable_type(field.type)):
+                self.cost += list_cost
+            else:
+                self.cost += 1
+
+        def leave_document(self, node, *_):
+            if self.cost > max_complexity:
+                self.report_error(GraphQLError(
+                    f"Query complexity {self.cost} exceeds the limit of {max_complexity}",
+                    node,
+                ))
+
+    return ComplexityLimitRule
+
+
+# -------------------------
+# Automatic persisted queries
+# -------------------------
+
+class PersistedQueries:
+    """ASGI middleware implementing Apollo-style automatic persisted queries.
+
+    A POST body may carry ``extensions.persistedQuery.sha256Hash`` instead of
+    the query text. Unknown hashes answer ``PersistedQueryNotFound`` so the
+    client retries with the full query, which is then remembered (LRU).
+    """
+
+    def __init__(self, app, path: str = "/graphql", maxsize: int = 1000):
+        self.app = app
+        self.path = path.rstrip("/")
+        self.maxsize = maxsize
+        self.queries = OrderedDict()
+
+    def _remember(self, digest, query):
+        self.queries[digest] = query
+        self.queries.move_to_end(digest)
+        while len(self.queries) > self.maxsize:
+            self.queries.popitem(last=False)
+
+    def _lookup(self, digest):
+        query = self.queries.get(digest)
+        if query is not None:
+            self.queries.move_to_end(digest)
+        return query
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "POST"
+            or scope["path"].rstrip("/") != self.path
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        body = b""
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            body += message.get("body", b"")
+            if not message.get("more_body", False):
+                break
+
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            payload = None
+
+        persisted = None
+        if isinstance(payload, dict) and isinstance(payload.get("extensions"), dict):
+            persisted = payload["extensions"].get("persistedQuery")
+
+        if isinstance(persisted, dict) and persisted.get("sha256Hash"):
+            digest = persisted["sha256Hash"]
+            query = payload.get("query")
+            if not isinstance(digest, str) or not isinstance(query, (str, type(None))):
+                await self._error(send, "sha256Hash and query must be strings", "BAD_REQUEST", status=400)
+                return
+            if query:
+                if hashlib.sha256(query.encode()).hexdigest() != digest:
+                    await self._error(send, "provided sha does not match query", "INVALID_PERSISTED_QUERY")
+                    return
+                self._remember(digest, query)
+            else:
+                query = self._lookup(digest)
+                if query is None:
+                    await self._error(send, "PersistedQueryNotFound", "PERSISTED_QUERY_NOT_FOUND")
+                    return
+                payload["query"] = query
+                body = json.dumps(payload).encode()
+
+        headers = [(k, v) for k, v in scope["headers"] if k != b"content-length"]
+        headers.append((b"content-length", str(len(body)).encode()))
+        scope = dict(scope, headers=headers)
+
+        replayed = False
+
+        async def replay():
+            nonlocal replayed
+            if not replayed:
+                replayed = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        await self.app(scope, replay, send)
+
+    async def _error(self, send, message, code, status=200):
+        content = json.dumps(
+            {"errors": [{"message": message, "extensions": {"code": code}}]}
+        ).encode()
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(content)).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": content})
@@ -1,7 +1,210 @@
-import websocket
+# ==========================================
+# WebSocket load generator for ws.py
+# ==========================================
+# Opens many concurrent connections to /ws/chat, ramps them up over a
+# configurable window, has each send at a fixed rate, and measures the
+# round trip of each client's own messages through the room broadcast.
+#
+#   uvicorn ws:app --port 8000
+#   python main.py --connections 2000 --ramp-up 10 --rate 1 --duration 30 --output ws_load.json
+#   python main.py --protocol msgpack --compression deflate ...
+#
+# Thousands of sockets need a raised file descriptor limit (ulimit -n).
 
-ws = websocket.WebSocket()
-ws.connect("ws://127.0.0.1:8000/ws/chat")
-ws.send("Hello WebSocket")
-print(ws.recv())
-ws.close()
+import argparse
+import asyncio
+import json
+import math
+import time
+
+import websockets
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+SUBPROTOCOLS = {"text": None, "json-batch": "chat.json.batch", "msgpack": "chat.msgpack"}
+
+
+def decode_frame(frame, protocol):
+    """Broadcast payloads carried by one frame for the given protocol."""
+    if protocol == "msgpack":
+        return msgpack.unpackb(frame)
+    if protocol == "json-batch":
+        return json.loads(frame)
+    return [json.loads(frame)]
+
+
+class Stats:
+    def __init__(self):
+        self.connect_times = []
+        self.rtts = []
+        self.sent = 0
+        self.received = 0
+        self.connect_failures = 0
+        self.dropped = 0
+        self.close_codes = {}
+
+
+def percentile(samples, p):
+    if not samples:
+        return None
+    index = min(len(samples) - 1, int(p * len(samples)))
+    return round(samples[index] * 1000, 3)
+
+
+def histogram(samples):
+    """Counts per power-of-two millisecond bucket ("<=1ms", "<=2ms", ...)."""
+    buckets = {}
+    for sample in samples:
+        ms = sample * 1000
+        bound = 1 if ms <= 1 else 2 ** math.ceil(math.log2(ms))
+        buckets[bound] = buckets.get(bound, 0) + 1
+    return {f"<={bound}ms": buckets[bound] for bound in sorted(buckets)}
+
+
+def summarize(samples):
+    samples = sorted(samples)
+    return {
+        "count": len(samples),
+        "p50_ms": percentile(samples, 0.50),
+        "p95_ms": percentile(samples, 0.95),
+        "p99_ms": percentile(samples, 0.99),
+        "max_ms": percentile(samples, 1.0),
+    }
+
+
+async def client(client_id, args, stats, deadline, start_delay):
+    await asyncio.sleep(start_delay)
+    url = f"{args.url}?room={args.room}"
+
+    subprotocol = SUBPROTOCOLS[args.protocol]
+    started = time.perf_counter()
+    try:
+        ws = await websockets.connect(
+            url,
+            open_timeout=args.connect_timeout,
+            subprotocols=[subprotocol] if subprotocol else None,
+            compression="deflate" if args.compression == "deflate" else None,
+        )
+    except (OSError, asyncio.TimeoutError, websockets.WebSocketException):
+        stats.connect_failures += 1
+        return
+    stats.connect_times.append(time.perf_counter() - started)
+
+    async def send_loop():
+        interval = 1 / args.rate
+        seq = 0
+        next_send = time.perf_counter()
+        while time.perf_counter() < deadline:
+            body = json.dumps({"client": client_id, "seq": seq, "sent": time.perf_counter()})
+            if args.protocol == "msgpack":
+                await ws.send(msgpack.packb(body))
+            else:
+                await ws.send(body)
+            stats.sent += 1
+            seq += 1
+            next_send += interval
+            await asyncio.sleep(max(0, next_send - time.perf_counter()))
+
+    async def receive_loop():
+        async for frame in ws:
+            now = time.perf_counter()
+            for payload in decode_frame(frame, args.protocol):
+                stats.received += 1
+                try:
+                    body = json.loads(payload["message"])
+                except (ValueError, KeyError, TypeError):
+                    continue
+                if body.get("client") == client_id:
+                    stats.rtts.append(now - body["sent"])
+
+    receiver = asyncio.create_task(receive_loop())
+    try:
+        await send_loop()
+        # Leave time for the last broadcasts to come back before closing.
+        await asyncio.sleep(args.drain)
+    except websockets.ConnectionClosed:
+        pass
+    finally:
+        receiver.cancel()
+        if ws.close_code is not None and ws.close_code != 1000:
+            stats.dropped += 1
+            key = str(ws.close_code)
+            stats.close_codes[key] = stats.close_codes.get(key, 0) + 1
+        await ws.close()
+
+
+async def run(args):
+    stats = Stats()
+    started = time.perf_counter()
+    deadline = started + args.ramp_up + args.duration
+    step = args.ramp_up / args.connections if args.connections else 0
+    await asyncio.gather(*(
+        client(i, args, stats, deadline, i * step) for i in range(args.connections)
+    ))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "config": {
+            "url": args.url,
+            "room": args.room,
+            "connections": args.connections,
+            "ramp_up_s": args.ramp_up,
+            "rate_per_connection": args.rate,
+            "duration_s": args.duration,
+            "protocol": args.protocol,
+            "compression": args.compression,
+        },
+        "connected": len(stats.connect_times),
+        "connect_failures": stats.connect_failures,
+        "dropped": stats.dropped,
+        "close_codes": stats.close_codes,
+        "messages_sent": stats.sent,
+        "messages_received": stats.received,
+        "received_per_s": round(stats.received / elapsed, 1),
+        "connect_time": summarize(stats.connect_times),
+        "round_trip": summarize(stats.rtts),
+        "round_trip_histogram": histogram(stats.rtts),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WebSocket load generator for /ws/chat")
+    parser.add_argument("--url", default="ws://127.0.0.1:8000/ws/chat")
+    parser.add_argument("--room", default="loadtest")
+    parser.add_argument("--connections", type=int, default=1000)
+    parser.add_argument("--ramp-up", type=float, default=10, help="seconds to open all connections")
+    parser.add_argument("--rate", type=float, default=1, help="messages per second per connection")
+    parser.add_argument("--duration", type=float, default=30, help="seconds to send after ramp-up")
+    parser.add_argument("--drain", type=float, default=2, help="seconds to wait for replies after sending")
+    parser.add_argument("--connect-timeout", type=float, default=10)
+    parser.add_argument("--protocol", choices=sorted(SUBPROTOCOLS), default="text")
+    parser.add_argument("--compression", choices=["none", "deflate"], default="none")
+    parser.add_argument("--output", help="write the JSON summary here")
+    args = parser.parse_args()
+    if args.protocol == "msgpack" and msgpack is None:
+        parser.error("--protocol msgpack needs the msgpack package")
+
+    result = asyncio.run(run(args))
+
+    rtt = result["round_trip"]
+    setup = result["connect_time"]
+    print(f"connections: {result['connected']}/{args.connections} "
+          f"(failed {result['connect_failures']}, dropped {result['dropped']})")
+    print(f"messages:    sent {result['messages_sent']}, received {result['messages_received']} "
+          f"({result['received_per_s']}/s)")
+    print(f"connect ms:  p50 {setup['p50_ms']}  p95 {setup['p95_ms']}  p99 {setup['p99_ms']}")
+    print(f"rtt ms:      p50 {rtt['p50_ms']}  p95 {rtt['p95_ms']}  p99 {rtt['p99_ms']}  max {rtt['max_ms']}")
+    for bucket, count in result["round_trip_histogram"].items():
+        print(f"  {bucket:>10} {count}")
+
+    if args.output:
+        with open(args.output, "w") as fp:
+            json.dump(result, fp, indent=2)
+        print(f"summary written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
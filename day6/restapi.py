@@ -1,17 +1,110 @@
-from fastapi import FastAPI, HTTPException
+import hashlib
+import itertools
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import FastAPI, HTTPException, Query, Request, Response
+from pydantic import BaseModel
+
+MAX_BATCH_IDS = 1000
+
 app = FastAPI(title="User API", version="v1")
-users = {}
+
+
+class UserStore:
+    """Users keyed by id, each with a version that changes on every write.
+
+    Sync endpoints run concurrently in FastAPI's threadpool, so all access
+    goes through a lock. Versions come from one global counter, so a user
+    that is deleted and re-created never reuses an ETag.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._users: Dict[int, Tuple[str, int]] = {}
+        self._versions = itertools.count(1)
+
+    def create(self, user_id: int, name: str) -> bool:
+        with self._lock:
+            if user_id in self._users:
+                return False
+            self._users[user_id] = (name, next(self._versions))
+            return True
+
+    def get(self, user_id: int) -> Optional[Tuple[str, int]]:
+        with self._lock:
+            return self._users.get(user_id)
+
+    def get_many(self, user_ids: List[int]) -> Dict[int, Tuple[str, int]]:
+        with self._lock:
+            return {i: self._users[i] for i in user_ids if i in self._users}
+
+
+users = UserStore()
+
+
+class BatchGetRequest(BaseModel):
+    ids: List[int]
+
+
+def not_modified(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # Weak comparison, as RFC 9110 requires for If-None-Match.
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag in candidates
+
+
+def cached_response(request: Request, response: Response, etag: str, body):
+    if not_modified(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return body
+
+
+def batch_get(request: Request, response: Response, ids: List[int]):
+    if len(ids) > MAX_BATCH_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_IDS} ids per request")
+
+    ids = list(dict.fromkeys(ids))
+    found = users.get_many(ids)
+    # The batch ETag covers which ids were asked for and each one's version.
+    fingerprint = ",".join(
+        f"{i}:{found[i][1]}" if i in found else f"{i}:-" for i in ids
+    )
+    etag = '"' + hashlib.sha1(fingerprint.encode()).hexdigest() + '"'
+    body = {
+        "users": [{"id": i, "name": found[i][0]} for i in ids if i in found],
+        "missing": [i for i in ids if i not in found],
+    }
+    return cached_response(request, response, etag, body)
+
+
 @app.post("/api/v1/users", status_code=201)
 def create_user(user_id: int, name: str):
- if user_id in users:
-    raise HTTPException(status_code=400, detail="User exists")
- users[user_id] = name
- return {"id": user_id, "name": name}
+    if not users.create(user_id, name):
+        raise HTTPException(status_code=400, detail="User exists")
+    return {"id": user_id, "name": name}
+
+
+@app.get("/api/v1/users")
+def list_users_by_id(request: Request, response: Response, ids: List[int] = Query(...)):
+    return batch_get(request, response, ids)
+
+
+@app.post("/api/v1/users:batchGet")
+def batch_get_users(request: Request, response: Response, body: BatchGetRequest):
+    return batch_get(request, response, body.ids)
 
 
 @app.get("/api/v1/users/{user_id}")
-def get_user(user_id: int):
- if user_id not in users:
-    raise HTTPException(status_code=404, detail="User not found")
- return {"id": user_id, "name": users[user_id]}
- 
+def get_user(user_id: int, request: Request, response: Response):
+    user = users.get(user_id)
+    if user is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    name, version = user
+    etag = f'"{user_id}-{version}"'
+    return cached_response(request, response, etag, {"id": user_id, "name": name})
@@ -0,0 +1,52 @@
+"""PersistedQueries request validation (graphql_limits.py)."""
+
+import asyncio
+import hashlib
+import json
+
+import pytest
+
+from graphql_limits import PersistedQueries
+
+
+async def echo_app(scope, receive, send):
+    message = await receive()
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": message["body"]})
+
+
+def post(middleware, payload):
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": json.dumps(payload).encode(), "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": "POST", "path": "/graphql", "headers": []}
+    asyncio.run(middleware(scope, receive, send))
+    return sent[0]["status"], json.loads(sent[1]["body"])
+
+
+@pytest.mark.parametrize("persisted", [
+    {"query": 123, "extensions": {"persistedQuery": {"sha256Hash": "abc"}}},
+    {"extensions": {"persistedQuery": {"sha256Hash": ["abc"]}}},
+])
+def test_non_string_fields_are_rejected(persisted):
+    status, body = post(PersistedQueries(echo_app), persisted)
+    assert status == 400
+    assert body["errors"][0]["extensions"]["code"] == "BAD_REQUEST"
+
+
+def test_hash_is_registered_then_resolved():
+    middleware = PersistedQueries(echo_app)
+    query = "{ users { id } }"
+    extensions = {"persistedQuery": {"version": 1, "sha256Hash": hashlib.sha256(query.encode()).hexdigest()}}
+
+    status, body = post(middleware, {"extensions": extensions})
+    assert body["errors"][0]["extensions"]["code"] == "PERSISTED_QUERY_NOT_FOUND"
+
+    post(middleware, {"query": query, "extensions": extensions})
+    status, body = post(middleware, {"extensions": extensions})
+    assert status == 200 and body["query"] == query
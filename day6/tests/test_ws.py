@@ -0,0 +1,77 @@
+"""Frame validation in ws.websocket_chat: wrong frame types and bad payloads."""
+
+import json
+import math
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+import ws
+
+msgpack = pytest.importorskip("msgpack")
+
+
+@pytest.fixture
+def client():
+    with TestClient(ws.app) as client:
+        yield client
+
+
+def assert_closed_with(session, code):
+    # receive_text() raises on the close frame; no data frame is expected.
+    with pytest.raises(WebSocketDisconnect) as exc:
+        session.receive_text()
+    assert exc.value.code == code
+
+
+def test_text_message_is_broadcast(client):
+    with client.websocket_connect("/ws/chat?room=t1") as session:
+        session.send_text("hello")
+        assert json.loads(session.receive_text())["message"] == "hello"
+
+
+def test_msgpack_message_is_broadcast(client):
+    with client.websocket_connect("/ws/chat?room=t2", subprotocols=["chat.msgpack"]) as session:
+        session.send_bytes(msgpack.packb({"message": {"text": "hi"}}))
+        [payload] = msgpack.unpackb(session.receive_bytes())
+        assert payload["message"] == {"text": "hi"}
+
+
+def test_binary_frame_on_text_connection_closes_1003(client):
+    with client.websocket_connect("/ws/chat?room=t3") as session:
+        session.send_bytes(b"\x00\x01")
+        assert_closed_with(session, ws.UNSUPPORTED_DATA_CLOSE_CODE)
+
+
+def test_text_frame_on_msgpack_connection_closes_1003(client):
+    with client.websocket_connect("/ws/chat?room=t4", subprotocols=["chat.msgpack"]) as session:
+        session.send_text("hello")
+        assert_closed_with(session, ws.UNSUPPORTED_DATA_CLOSE_CODE)
+
+
+@pytest.mark.parametrize("frame", [
+    b"\x92\x01",                               # array of two, one element
+    b"\xc1",                                   # reserved type byte
+    msgpack.packb(1) + msgpack.packb(2),       # trailing data
+])
+def test_malformed_msgpack_closes_1007(client, frame):
+    with client.websocket_connect("/ws/chat?room=t5", subprotocols=["chat.msgpack"]) as session:
+        session.send_bytes(frame)
+        assert_closed_with(session, ws.INVALID_PAYLOAD_CLOSE_CODE)
+
+
+@pytest.mark.parametrize("message", [b"\x00\x01", {"nested": b"raw"}, math.nan])
+def test_non_json_msgpack_message_closes_1007(client, message):
+    with client.websocket_connect("/ws/chat?room=t6", subprotocols=["chat.msgpack"]) as session:
+        session.send_bytes(msgpack.packb({"message": message}))
+        assert_closed_with(session, ws.INVALID_PAYLOAD_CLOSE_CODE)
+
+
+def test_bad_frame_does_not_affect_other_connections(client):
+    with client.websocket_connect("/ws/chat?room=t7") as good:
+        with client.websocket_connect("/ws/chat?room=t7") as bad:
+            bad.send_bytes(b"\xff")
+            assert_closed_with(bad, ws.UNSUPPORTED_DATA_CLOSE_CODE)
+        good.send_text("still here")
+        assert json.loads(good.receive_text())["message"] == "still here"
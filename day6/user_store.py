@@ -0,0 +1,93 @@
+import threading
+from bisect import bisect_right
+from typing import Dict, Generic, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class DuplicateEmail(ValueError):
+    def __init__(self, email: str):
+        super().__init__(f"email already registered: {email}")
+        self.email = email
+
+
+class UserStore(Generic[T]):
+    """In-memory user store with O(1) lookups by id and by email.
+
+    Ids come from a monotonic counter and are never reused after a delete,
+    so an append-only id list doubles as a sorted index for keyset paging.
+    All mutations happen under one lock, so the store is safe to share
+    between concurrent requests and threadpool-run resolvers.
+    """
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._lock = threading.RLock()
+        self._by_id: Dict[int, T] = {}
+        self._by_email: Dict[str, int] = {}
+        self._order: List[int] = []
+        self._deleted = 0
+        self._next_id = 1
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def all(self) -> List[T]:
+        with self._lock:
+            return list(self._by_id.values())
+
+    def get(self, user_id: int) -> Optional[T]:
+        return self._by_id.get(user_id)
+
+    def get_many(self, user_ids) -> List[Optional[T]]:
+        by_id = self._by_id
+        return [by_id.get(user_id) for user_id in user_ids]
+
+    def get_by_email(self, email: str) -> Optional[T]:
+        user_id = self._by_email.get(email.lower())
+        return None if user_id is None else self._by_id.get(user_id)
+
+    def create(self, name: str, email: str) -> T:
+        key = email.lower()
+        with self._lock:
+            if key in self._by_email:
+                raise DuplicateEmail(email)
+            user = self._factory(id=self._next_id, name=name, email=email)
+            self._next_id += 1
+            self._by_id[user.id] = user
+            self._by_email[key] = user.id
+            self._order.append(user.id)
+            return user
+
+    def update(self, user_id: int, name: Optional[str] = None) -> Optional[T]:
+        with self._lock:
+            user = self._by_id.get(user_id)
+            if user is not None and name:
+                user.name = name
+            return user
+
+    def delete(self, user_id: int) -> bool:
+        with self._lock:
+            user = self._by_id.pop(user_id, None)
+            if user is None:
+                return False
+            self._by_email.pop(user.email.lower(), None)
+            # Deleted ids stay in _order until they make up half of it.
+            self._deleted += 1
+            if self._deleted > len(self._order) // 2:
+                self._order = [i for i in self._order if i in self._by_id]
+                self._deleted = 0
+            return True
+
+    def page(self, after: Optional[int], limit: int) -> Tuple[List[T], bool]:
+        """Up to ``limit`` users with id > ``after`` and whether more follow."""
+        with self._lock:
+            order = self._order
+            i = 0 if after is None else bisect_right(order, after)
+            found: List[T] = []
+            while i < len(order) and len(found) <= limit:
+                user = self._by_id.get(order[i])
+                if user is not None:
+                    found.append(user)
+                i += 1
+            return found[:limit], len(found) > limit
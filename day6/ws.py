@@ -1,20 +1,327 @@
+import asyncio
+import itertools
+import json
+import logging
+import logging.handlers
+import queue
+import time
+from collections import defaultdict
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 
-app = FastAPI()
+try:
+    import msgpack
+except ImportError:  # msgpack framing is only offered when installed
+    msgpack = None
+
+DEFAULT_ROOM = "lobby"
+OUTBOUND_QUEUE_SIZE = 256  # frames buffered per connection before it counts as slow
+SLOW_CONSUMER_CLOSE_CODE = 1013  # "try again later"
+UNSUPPORTED_DATA_CLOSE_CODE = 1003  # text frame on a binary protocol or vice versa
+INVALID_PAYLOAD_CLOSE_CODE = 1007  # frame does not decode to a JSON-safe message
+FLUSH_WINDOW = 0.005  # seconds batched protocols wait to coalesce messages
+MAX_BATCH = 128
+
+# -------------------------
+# Structured, non-blocking logging
+# -------------------------
+# Handlers run on a QueueListener thread, so the event loop only pays for
+# an in-memory enqueue per record.
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "event": record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", {}))
+        return json.dumps(entry)
+
+
+_log_queue = queue.SimpleQueue()
+_log_handler = logging.StreamHandler()
+_log_handler.setFormatter(JsonFormatter())
+log_listener = logging.handlers.QueueListener(_log_queue, _log_handler)
+
+logger = logging.getLogger("ws")
+logger.addHandler(logging.handlers.QueueHandler(_log_queue))
+logger.setLevel(logging.INFO)
+logger.propagate = False
+
+
+def log(event, level=logging.INFO, **fields):
+    if logger.isEnabledFor(level):
+        logger.log(level, event, extra={"fields": fields})
+
+
+# -------------------------
+# Wire protocols
+# -------------------------
+# Chosen per connection through the WebSocket subprotocol header. Without one
+# the server sends one JSON text frame per message. Batched protocols send
+# every message that lands within FLUSH_WINDOW as a single array frame.
+# permessage-deflate is negotiated by the ASGI server (see __main__ below)
+# and applies to all of them. decode() raises ValueError on a malformed frame.
+
+class TextCodec:
+    name = None
+    batched = False
+    binary = False
+
+    def encode(self, payload):
+        return json.dumps(payload)
+
+    def decode(self, data):
+        return data
+
+    def join(self, items):
+        return items[0]
+
+
+class JsonBatchCodec(TextCodec):
+    name = "chat.json.batch"
+    batched = True
+
+    def join(self, items):
+        # Items are already-serialised JSON documents.
+        return "[" + ",".join(items) + "]"
+
+
+class MsgpackBatchCodec:
+    name = "chat.msgpack"
+    batched = True
+    binary = True
+
+    def encode(self, payload):
+        return msgpack.packb(payload)
+
+    def decode(self, data):
+        try:
+            value = msgpack.unpackb(data)
+        except (ValueError, TypeError, msgpack.UnpackException) as exc:
+            raise ValueError(f"malformed msgpack frame: {exc}") from None
+        return value.get("message") if isinstance(value, dict) else value
+
+    def join(self, items):
+        # A msgpack array is its header followed by the packed elements, so
+        # pre-encoded items are concatenated without re-serialising.
+        count = len(items)
+        if count < 16:
+            header = bytes([0x90 | count])
+        elif count < 0x10000:
+            header = b"\xdc" + count.to_bytes(2, "big")
+        else:
+            header = b"\xdd" + count.to_bytes(4, "big")
+        return header + b"".join(items)
+
+
+TEXT = TextCodec()
+CODECS = {JsonBatchCodec.name: JsonBatchCodec()}
+if msgpack is not None:
+    CODECS[MsgpackBatchCodec.name] = MsgpackBatchCodec()
+
+
+def json_safe(value) -> bool:
+    """Whether ``value`` survives json.dumps, which every codec relies on."""
+    if isinstance(value, str):
+        return True
+    try:
+        json.dumps(value, allow_nan=False)
+    except (TypeError, ValueError):
+        return False
+    return True
+
+
+def negotiate(ws: WebSocket):
+    for requested in ws.scope.get("subprotocols", []):
+        if requested in CODECS:
+            return CODECS[requested]
+    return TEXT
+
+
+# -------------------------
+# Pub/sub hub
+# -------------------------
+
+class Connection:
+    _ids = itertools.count(1)
+
+    def __init__(self, ws: WebSocket, room: str, queue_size: int, codec=TEXT):
+        self.id = next(self._ids)
+        self.ws = ws
+        self.room = room
+        self.codec = codec
+        self.outbound = asyncio.Queue(maxsize=queue_size)
+        self.writer = None
+
+    def offer(self, frame) -> bool:
+        try:
+            self.outbound.put_nowait(frame)
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    async def _send(self, frame):
+        if self.codec.binary:
+            await self.ws.send_bytes(frame)
+        else:
+            await self.ws.send_text(frame)
+
+    async def send_loop(self):
+        while True:
+            item = await self.outbound.get()
+            if not self.codec.batched:
+                await self._send(item)
+                continue
+
+            items = [item]
+            await asyncio.sleep(FLUSH_WINDOW)
+            while len(items) < MAX_BATCH and not self.outbound.empty():
+                items.append(self.outbound.get_nowait())
+            await self._send(self.codec.join(items))
+
+
+class Hub:
+    def __init__(self):
+        self.rooms = defaultdict(set)
+        self.published = 0
+        self.delivered = 0
+        self.dropped_connections = 0
+        self._closing = set()  # keeps close tasks alive until they finish
+
+    def join(self, conn: Connection):
+        self.rooms[conn.room].add(conn)
+        conn.writer = asyncio.create_task(conn.send_loop())
+
+    def leave(self, conn: Connection):
+        members = self.rooms.get(conn.room)
+        if members is not None:
+            members.discard(conn)
+            if not members:
+                del self.rooms[conn.room]
+        if conn.writer is not None:
+            conn.writer.cancel()
+
+    def broadcast(self, room: str, payload: dict) -> int:
+        # Serialise once per protocol in use; subscribers share the result.
+        encoded = {}
+        slow = []
+        delivered = 0
+        for conn in self.rooms.get(room, ()):
+            frame = encoded.get(conn.codec.name)
+            if frame is None:
+                frame = encoded[conn.codec.name] = conn.codec.encode(payload)
+            if conn.offer(frame):
+                delivered += 1
+            else:
+                slow.append(conn)
+        for conn in slow:
+            self.drop(conn)
+
+        self.published += 1
+        self.delivered += delivered
+        return delivered
+
+    def drop(self, conn: Connection):
+        """Disconnect a subscriber whose outbound queue overflowed."""
+        self.leave(conn)
+        self.dropped_connections += 1
+        log("slow_consumer_dropped", level=logging.WARNING, conn=conn.id, room=conn.room)
+        task = asyncio.create_task(self._close(conn))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    async def _close(self, conn: Connection):
+        try:
+            await conn.ws.close(code=SLOW_CONSUMER_CLOSE_CODE)
+        except RuntimeError:
+            pass
+
+    def stats(self) -> dict:
+        return {
+            "rooms": {room: len(members) for room, members in self.rooms.items()},
+            "published": self.published,
+            "delivered": self.delivered,
+            "dropped_connections": self.dropped_connections,
+        }
+
+
+hub = Hub()
+
+
+# -------------------------
+# App
+# -------------------------
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    log_listener.start()
+    yield
+    log_listener.stop()
+
+
+app = FastAPI(lifespan=lifespan)
 
 @app.get("/")
 def root():
     return {"status": "WebSocket server running"}
 
+async def reject(conn: Connection, code: int, reason: str):
+    log("frame_rejected", level=logging.WARNING, conn=conn.id, room=conn.room,
+        code=code, reason=reason)
+    try:
+        await conn.ws.close(code=code, reason=reason)
+    except RuntimeError:
+        pass
+
+@app.get("/stats")
+def stats():
+    return hub.stats()
+
 @app.websocket("/ws/chat")
-async def websocket_chat(ws: WebSocket):
-    await ws.accept()
-    print("Client connected")
+async def websocket_chat(ws: WebSocket, room: str = DEFAULT_ROOM):
+    codec = negotiate(ws)
+    await ws.accept(subprotocol=codec.name)
+    conn = Connection(ws, room, OUTBOUND_QUEUE_SIZE, codec)
+    hub.join(conn)
+    log("connected", conn=conn.id, room=room, protocol=codec.name or "text")
 
     try:
         while True:
-            message = await ws.receive_text()
-            print("Received:", message)
-            await ws.send_text(f"Echo: {message}")
-    except WebSocketDisconnect:
-        print("Client disconnected")
+            event = await ws.receive()
+            if event["type"] == "websocket.disconnect":
+                break
+            data = event.get("bytes") if codec.binary else event.get("text")
+            if data is None:
+                await reject(conn, UNSUPPORTED_DATA_CLOSE_CODE, "unexpected frame type")
+                break
+            try:
+                message = codec.decode(data)
+            except ValueError:
+                await reject(conn, INVALID_PAYLOAD_CLOSE_CODE, "malformed frame")
+                break
+            if not json_safe(message):
+                await reject(conn, INVALID_PAYLOAD_CLOSE_CODE, "message is not JSON-safe")
+                break
+            log("message", level=logging.DEBUG, conn=conn.id, room=room, size=len(data))
+            hub.broadcast(room, {
+                "room": room,
+                "from": conn.id,
+                "ts": time.time(),
+                "message": message,
+            })
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    finally:
+        hub.leave(conn)
+        log("disconnected", conn=conn.id, room=room)
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    # The websockets implementation negotiates permessage-deflate with
+    # clients that offer it.
+    uvicorn.run(app, host="0.0.0.0", port=8000, ws="websockets", ws_per_message_deflate=True)
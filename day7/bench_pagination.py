@@ -0,0 +1,99 @@
+"""
+Day 7: Keyset vs OFFSET pagination over one user's order history
+
+Loads --orders rows for a dedicated user (COPY), then walks every page with
+the keyset query and times selected pages against the equivalent OFFSET
+query.
+
+    python bench_pagination.py --orders 1000000 --page-size 50
+"""
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from bulk_load import copy_rows, next_id, sync_sequence
+from postgress import create_tables, get_connection, order_page_query
+
+OFFSET_SQL = """
+    SELECT o.id, o.amount, o.created_at, p.status
+    FROM orders o
+    LEFT JOIN LATERAL (
+        SELECT status FROM payments WHERE order_id = o.id ORDER BY id DESC LIMIT 1
+    ) p ON TRUE
+    WHERE o.user_id = %s
+    ORDER BY o.created_at DESC, o.id DESC
+    LIMIT %s OFFSET %s
+"""
+
+
+def seed_user(conn, orders):
+    with conn.cursor() as cur:
+        cur.execute(
+            "INSERT INTO users (name, email) VALUES ('Pager', 'bench-pagination@example.com') "
+            "ON CONFLICT (email) DO UPDATE SET name = EXCLUDED.name RETURNING id"
+        )
+        user_id = cur.fetchone()[0]
+        cur.execute("SELECT COUNT(*) FROM orders WHERE user_id = %s", (user_id,))
+        missing = orders - cur.fetchone()[0]
+        if missing > 0:
+            rng = random.Random(1)
+            now = datetime.utcnow()
+            with conn.transaction():
+                first = next_id(cur, "orders")
+                copy_rows(
+                    cur, "orders", ("id", "user_id", "amount", "created_at"),
+                    ["int4", "int4", "numeric", "timestamp"],
+                    (
+                        (first + i, user_id, Decimal(rng.randint(100, 99999)) / 100,
+                         now - timedelta(seconds=rng.randint(0, 365 * 86400)))
+                        for i in range(missing)
+                    ),
+                )
+                sync_sequence(cur, "orders")
+            cur.execute("ANALYZE orders")
+    return user_id
+
+
+def timed_fetch(cur, sql, params):
+    started = time.perf_counter()
+    cur.execute(sql, params)
+    rows = cur.fetchall()
+    return rows, (time.perf_counter() - started) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--orders", type=int, default=200000)
+    parser.add_argument("--page-size", type=int, default=50)
+    args = parser.parse_args()
+
+    conn = get_connection()
+    create_tables(conn)
+    user_id = seed_user(conn, args.orders)
+
+    pages = -(-args.orders // args.page_size)
+    checkpoints = sorted({1, 10, 100, 1000, 10000, pages} & set(range(1, pages + 1)))
+
+    print(f"\n--- {args.orders} orders, page size {args.page_size} ---")
+    print(f"{'page':>8} {'keyset ms':>10} {'offset ms':>10}")
+    after = None
+    with conn.cursor() as cur:
+        for page in range(1, pages + 1):
+            sql, params = order_page_query(user_id, args.page_size, after)
+            rows, keyset_ms = timed_fetch(cur, sql, params)
+            if page in checkpoints:
+                offset = (page - 1) * args.page_size
+                _, offset_ms = timed_fetch(cur, OFFSET_SQL, (user_id, args.page_size, offset))
+                print(f"{page:>8} {keyset_ms:>10.3f} {offset_ms:>10.3f}")
+            if not rows:
+                break
+            after = (rows[-1][2], rows[-1][0])
+
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Day 7: Round trips and latency, one statement at a time vs pipeline mode,
+and unprepared vs prepared reads.
+
+    python bench_pipeline.py --orders 2000 --reads 5000
+"""
+
+import argparse
+import time
+
+from psycopg.waiting import Wait
+
+from postgress import (
+    ORDERS_BY_USER,
+    create_orders,
+    create_tables,
+    get_connection,
+    get_orders_for_user,
+)
+
+
+class RoundTripCounter:
+    """Counts network round trips made on ``conn``.
+
+    Every psycopg network operation runs through ``conn.wait``. A wait whose
+    generator asks for read-only readiness (Wait.R) has nothing left to send
+    and sits idle until the server answers; each such wait is one round
+    trip. Pipelined sends poll read+write and are not counted.
+    """
+
+    def __init__(self, conn):
+        self.count = 0
+        self._wait = conn.wait
+        conn.wait = self._counting_wait
+
+    def _counting_wait(self, gen, *args, **kwargs):
+        return self._wait(self._watch(gen), *args, **kwargs)
+
+    def _watch(self, gen):
+        blocked = False
+        try:
+            state = next(gen)
+            while True:
+                blocked = blocked or state == Wait.R
+                state = gen.send((yield state))
+        except StopIteration as stop:
+            return stop.value
+        finally:
+            if blocked:
+                self.count += 1
+
+
+def sequential_orders(conn, orders):
+    """The seed_data pattern: INSERT ... RETURNING id, then the payment."""
+    ids = []
+    with conn.cursor() as cur:
+        for user_id, amount, status in orders:
+            cur.execute(
+                "INSERT INTO orders (user_id, amount) VALUES (%s, %s) RETURNING id",
+                (user_id, amount),
+            )
+            order_id = cur.fetchone()[0]
+            cur.execute(
+                "INSERT INTO payments (order_id, status) VALUES (%s, %s) RETURNING id",
+                (order_id, status),
+            )
+            ids.append((order_id, cur.fetchone()[0]))
+    return ids
+
+
+def unprepared_reads(conn, user_id, count):
+    with conn.cursor() as cur:
+        for _ in range(count):
+            cur.execute(ORDERS_BY_USER, (user_id,), prepare=False)
+            cur.fetchall()
+
+
+def prepared_reads(conn, user_id, count):
+    for _ in range(count):
+        get_orders_for_user(conn, user_id)
+
+
+def timed(counter, fn, *args):
+    """Run ``fn``; return (seconds, round trips it made)."""
+    before = counter.count
+    started = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - started, counter.count - before
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--orders", type=int, default=2000)
+    parser.add_argument("--reads", type=int, default=5000)
+    args = parser.parse_args()
+
+    conn = get_connection()
+    create_tables(conn)
+    with conn.cursor() as cur:
+        cur.execute(
+            "INSERT INTO users (name, email) VALUES ('Bench', 'bench-pipeline@example.com') "
+            "ON CONFLICT (email) DO UPDATE SET name = EXCLUDED.name RETURNING id"
+        )
+        user_id = cur.fetchone()[0]
+
+    orders = [(user_id, 10 + i % 90, "SUCCESS") for i in range(args.orders)]
+    counter = RoundTripCounter(conn)
+
+    print(f"\n--- WRITES ({args.orders} orders + payments) ---")
+    print(f"{'mode':<22} {'round trips':>12} {'total s':>9} {'per order ms':>13}")
+    seq, seq_trips = timed(counter, sequential_orders, conn, orders)
+    print(f"{'one at a time':<22} {seq_trips:>12} {seq:>9.3f} {seq / args.orders * 1000:>13.3f}")
+    pipe, pipe_trips = timed(counter, create_orders, conn, orders)
+    print(f"{'pipeline':<22} {pipe_trips:>12} {pipe:>9.3f} {pipe / args.orders * 1000:>13.3f}")
+    print(f"speedup: {seq / pipe:.1f}x")
+
+    print(f"\n--- READS ({args.reads} x ORDERS_BY_USER) ---")
+    print(f"{'mode':<22} {'round trips':>12} {'total s':>9} {'per query ms':>13}")
+    plain, plain_trips = timed(counter, unprepared_reads, conn, user_id, args.reads)
+    print(f"{'unprepared':<22} {plain_trips:>12} {plain:>9.3f} {plain / args.reads * 1000:>13.3f}")
+    prepared, prepared_trips = timed(counter, prepared_reads, conn, user_id, args.reads)
+    print(f"{'prepared':<22} {prepared_trips:>12} {prepared:>9.3f} {prepared / args.reads * 1000:>13.3f}")
+    print(f"speedup: {plain / prepared:.2f}x")
+
+    with conn.cursor() as cur:
+        cur.execute(
+            "DELETE FROM payments WHERE order_id IN (SELECT id FROM orders WHERE user_id = %s)",
+            (user_id,),
+        )
+        cur.execute("DELETE FROM orders WHERE user_id = %s", (user_id,))
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+"""
+Day 7: High-volume seed / ingest for users, orders and payments
+Driver: psycopg v3 (COPY ... FROM STDIN, binary format)
+
+Generates synthetic rows and streams them with COPY instead of one
+INSERT ... RETURNING round trip per row. Ids are assigned client-side from
+a range reserved under a table lock, so orders and payments reference their
+parents without reading anything back. Optionally drops secondary indexes
+and foreign keys for the load and rebuilds them in one pass afterwards.
+
+    python bulk_load.py --users 1000000 --orders-per-user 5 --defer-indexes
+    python bulk_load.py --users 1000000 --partition-orders
+"""
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from postgress import (
+    create_tables,
+    ensure_order_partitions,
+    get_connection,
+    orders_partitioned,
+)
+
+TABLES = ("users", "orders", "payments")
+PAYMENT_STATUSES = ("SUCCESS", "SUCCESS", "SUCCESS", "PENDING", "FAILED")
+
+
+# =========================
+# Row generators
+# =========================
+def generate_users(first_id, count):
+    for user_id in range(first_id, first_id + count):
+        yield (user_id, f"User {user_id}", f"user{user_id}@example.com")
+
+
+def generate_orders(first_id, user_ids, per_user, days, rng):
+    """Yield order rows; each user gets 0..2*per_user orders (mean per_user)."""
+    now = datetime.utcnow()
+    order_id = first_id
+    for user_id in user_ids:
+        for _ in range(rng.randint(0, 2 * per_user)):
+            created_at = now - timedelta(seconds=rng.randint(0, days * 86400))
+            amount = Decimal(rng.randint(100, 100000)) / 100
+            yield (order_id, user_id, amount, created_at)
+            order_id += 1
+
+
+def generate_payments(first_id, order_ids, ratio, rng):
+    payment_id = first_id
+    for order_id in order_ids:
+        if rng.random() < ratio:
+            yield (payment_id, order_id, rng.choice(PAYMENT_STATUSES))
+            payment_id += 1
+
+
+# =========================
+# COPY helpers
+# =========================
+def copy_rows(cur, table, columns, types, rows):
+    """Stream ``rows`` into ``table`` with binary COPY; returns rows written."""
+    written = 0
+    sql = f"COPY {table} ({', '.join(columns)}) FROM STDIN (FORMAT BINARY)"
+    with cur.copy(sql) as copy:
+        copy.set_types(types)
+        for row in rows:
+            copy.write_row(row)
+            written += 1
+    return written
+
+
+def next_id(cur, table):
+    cur.execute(f"SELECT COALESCE(MAX(id), 0) + 1 FROM {table}")
+    return cur.fetchone()[0]
+
+
+def sync_sequence(cur, table):
+    cur.execute(
+        f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+        f"COALESCE((SELECT MAX(id) FROM {table}), 1))"
+    )
+
+
+# =========================
+# Deferred indexes / FKs
+# =========================
+def drop_secondary_objects(cur):
+    """Drop non-constraint indexes and foreign keys; return the DDL to restore them."""
+    # On a partitioned table indexdef reads "ON ONLY orders", which would
+    # restore an invalid parent index with no partition children; without
+    # ONLY it is rebuilt on every partition and attached.
+    cur.execute("""
+        SELECT replace(indexdef, ' ON ONLY ', ' ON '),
+               format('DROP INDEX %%I.%%I', schemaname, indexname)
+        FROM pg_indexes i
+        WHERE tablename = ANY(%s)
+          AND NOT EXISTS (
+              SELECT 1 FROM pg_constraint c
+              WHERE c.conindid = format('%%I.%%I', i.schemaname, i.indexname)::regclass
+          )
+    """, (list(TABLES),))
+    indexes = cur.fetchall()
+
+    cur.execute("""
+        SELECT format('ALTER TABLE %%s ADD CONSTRAINT %%I %%s',
+                      conrelid::regclass, conname, pg_get_constraintdef(oid)),
+               format('ALTER TABLE %%s DROP CONSTRAINT %%I', conrelid::regclass, conname)
+        FROM pg_constraint
+        WHERE contype = 'f' AND conrelid::regclass::text = ANY(%s)
+    """, (list(TABLES),))
+    foreign_keys = cur.fetchall()
+
+    for _, drop in foreign_keys + indexes:
+        cur.execute(drop)
+    # Restore indexes first so FK validation can use them.
+    return [create for create, _ in indexes] + [create for create, _ in foreign_keys]
+
+
+# =========================
+# Load
+# =========================
+def load(conn, users, orders_per_user, payment_ratio, days, defer_indexes, seed):
+    rng = random.Random(seed)
+    report = {}
+
+    with conn.transaction():
+        with conn.cursor() as cur:
+            # Exclusive locks make the client-side id ranges safe to use.
+            cur.execute("LOCK TABLE users, orders, payments IN EXCLUSIVE MODE")
+
+            if orders_partitioned(conn):
+                # Give every month the generated timestamps span its partition.
+                ensure_order_partitions(conn, months_back=days // 30 + 1)
+
+            restore = drop_secondary_objects(cur) if defer_indexes else []
+
+            first_user = next_id(cur, "users")
+            started = time.perf_counter()
+            count = copy_rows(
+                cur, "users", ("id", "name", "email"), ["int4", "varchar", "varchar"],
+                generate_users(first_user, users),
+            )
+            report["users"] = (count, time.perf_counter() - started)
+
+            first_order = next_id(cur, "orders")
+            started = time.perf_counter()
+            orders = copy_rows(
+                cur, "orders", ("id", "user_id", "amount", "created_at"),
+                ["int4", "int4", "numeric", "timestamp"],
+                generate_orders(
+                    first_order,
+                    range(first_user, first_user + users),
+                    orders_per_user, days, rng,
+                ),
+            )
+            report["orders"] = (orders, time.perf_counter() - started)
+
+            started = time.perf_counter()
+            count = copy_rows(
+                cur, "payments", ("id", "order_id", "status"), ["int4", "int4", "varchar"],
+                generate_payments(
+                    next_id(cur, "payments"),
+                    range(first_order, first_order + orders),
+                    payment_ratio, rng,
+                ),
+            )
+            report["payments"] = (count, time.perf_counter() - started)
+
+            for table in TABLES:
+                sync_sequence(cur, table)
+
+            if restore:
+                started = time.perf_counter()
+                for ddl in restore:
+                    cur.execute(ddl)
+                report["rebuild indexes/fks"] = (len(restore), time.perf_counter() - started)
+
+            started = time.perf_counter()
+            cur.execute("ANALYZE users, orders, payments")
+            report["analyze"] = (len(TABLES), time.perf_counter() - started)
+
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="COPY-based bulk loader for users/orders/payments")
+    parser.add_argument("--users", type=int, default=100000)
+    parser.add_argument("--orders-per-user", type=int, default=5, help="mean orders per user")
+    parser.add_argument("--payment-ratio", type=float, default=0.8, help="share of orders with a payment")
+    parser.add_argument("--days", type=int, default=365, help="spread order timestamps over this many days")
+    parser.add_argument("--defer-indexes", action="store_true",
+                        help="drop secondary indexes and FKs during the load, rebuild after")
+    parser.add_argument("--partition-orders", action="store_true",
+                        help="create orders range-partitioned by month (new tables only)")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    conn = get_connection()
+    create_tables(conn, partitioned=args.partition_orders)
+    conn.autocommit = False
+
+    started = time.perf_counter()
+    report = load(
+        conn, args.users, args.orders_per_user, args.payment_ratio,
+        args.days, args.defer_indexes, args.seed,
+    )
+    total = time.perf_counter() - started
+    conn.close()
+
+    print("\n--- BULK LOAD ---")
+    for step, (count, seconds) in report.items():
+        rate = f"{count / seconds:,.0f} rows/s" if step in TABLES and seconds else ""
+        print(f"{step:<22} {count:>12,} {seconds:>9.2f}s  {rate}")
+    print(f"{'total':<22} {'':>12} {total:>9.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""
+Day 7: Order history API (FastAPI + async psycopg pool)
+
+    uvicorn orders_api:app --port 8001
+    GET /users/1/orders?limit=50
+    GET /users/1/orders?limit=50&cursor=<next_cursor from the previous page>
+"""
+
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, HTTPException, Query
+
+from postgress import close_async_pool, fetch_order_page, get_async_pool
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await get_async_pool()
+    yield
+    await close_async_pool()
+
+
+app = FastAPI(title="Order History API", lifespan=lifespan)
+
+
+@app.get("/users/{user_id}/orders")
+async def list_orders(
+    user_id: int,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: str = None,
+):
+    pool = await get_async_pool()
+    async with pool.connection() as conn:
+        try:
+            orders, next_cursor = await fetch_order_page(conn, user_id, limit, cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    return {"orders": orders, "next_cursor": next_cursor}
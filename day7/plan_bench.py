@@ -0,0 +1,246 @@
+"""
+Day 7: Query-plan regression harness
+
+Runs a catalogue of queries (every report in run_queries plus the hot
+per-user lookup) with EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON), records plan
+shape, timings and buffer usage, and compares them with a saved baseline:
+
+    python plan_bench.py --reseed 100000 --save plans.json
+    python plan_bench.py --compare plans.json --threshold 0.25
+
+It can also try candidate indexes inside a rolled-back transaction and
+report which queries they speed up. Candidates are given explicitly or
+derived from seq-scan filters and join conditions in the current plans:
+
+    python plan_bench.py --candidate "CREATE INDEX ON orders (amount)"
+    python plan_bench.py --suggest-indexes
+"""
+
+import argparse
+import json
+import re
+import statistics
+from datetime import datetime, timezone
+
+from bulk_load import load
+from postgress import ORDERS_BY_USER, REPORT_QUERIES, create_tables, get_connection
+
+INDEX_SCANS = {"Index Scan", "Index Only Scan", "Bitmap Heap Scan", "Bitmap Index Scan"}
+
+CATALOGUE = {
+    **{title: (sql, None) for title, sql in REPORT_QUERIES.items()},
+    "ORDERS BY USER": (ORDERS_BY_USER, (1,)),
+}
+
+
+# =========================
+# Plan capture
+# =========================
+def walk(node):
+    yield node
+    for child in node.get("Plans", []):
+        yield from walk(child)
+
+
+def explain(conn, sql, params):
+    with conn.cursor() as cur:
+        cur.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}", params)
+        return cur.fetchone()[0][0]
+
+
+def profile(conn, sql, params, repeat):
+    runs = [explain(conn, sql, params) for _ in range(repeat)]
+    plan = runs[-1]["Plan"]
+    nodes = list(walk(plan))
+    return {
+        "execution_ms": round(statistics.median(r["Execution Time"] for r in runs), 3),
+        "planning_ms": round(statistics.median(r["Planning Time"] for r in runs), 3),
+        "shared_hit_blocks": plan.get("Shared Hit Blocks", 0),
+        "shared_read_blocks": plan.get("Shared Read Blocks", 0),
+        "total_cost": plan.get("Total Cost"),
+        "shape": [
+            " ".join(filter(None, (n["Node Type"], n.get("Relation Name"), n.get("Index Name"))))
+            for n in nodes
+        ],
+        "scans": {
+            n["Relation Name"]: n["Node Type"] for n in nodes if n.get("Relation Name")
+        },
+        "plan": plan,
+    }
+
+
+def run_catalogue(conn, repeat):
+    return {name: profile(conn, sql, params, repeat) for name, (sql, params) in CATALOGUE.items()}
+
+
+# =========================
+# Comparison
+# =========================
+def compare(current, baseline, threshold, min_ms):
+    findings = []
+    for name, now in current.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+        for relation, scan in now["scans"].items():
+            was = before["scans"].get(relation)
+            if scan == "Seq Scan" and was in INDEX_SCANS:
+                findings.append(f"{name}: {relation} now Seq Scan (was {was})")
+        if now["shape"] != before["shape"]:
+            findings.append(f"{name}: plan shape changed")
+        slower = now["execution_ms"] - before["execution_ms"]
+        if slower > min_ms and now["execution_ms"] > before["execution_ms"] * (1 + threshold):
+            findings.append(
+                f"{name}: execution {before['execution_ms']}ms -> {now['execution_ms']}ms"
+            )
+    return findings
+
+
+# =========================
+# Candidate indexes
+# =========================
+def table_columns(conn):
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT table_name, column_name FROM information_schema.columns
+            WHERE table_schema = current_schema()
+        """)
+        columns = {}
+        for table, column in cur.fetchall():
+            columns.setdefault(table, set()).add(column)
+        return columns
+
+
+def leading_index_columns(conn):
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT t.relname, a.attname
+            FROM pg_index i
+            JOIN pg_class t ON t.oid = i.indrelid
+            JOIN pg_attribute a ON a.attrelid = t.oid AND a.attnum = i.indkey[0]
+            WHERE t.relnamespace = current_schema()::regnamespace
+        """)
+        return set(cur.fetchall())
+
+
+def suggest_indexes(conn, results):
+    """Single-column indexes for columns filtered or joined on by seq scans."""
+    columns = table_columns(conn)
+    indexed = leading_index_columns(conn)
+    wanted = set()
+    for result in results.values():
+        nodes = list(walk(result["plan"]))
+        aliases = {n["Alias"]: n["Relation Name"] for n in nodes if n.get("Relation Name")}
+        seq_scanned = {n["Relation Name"] for n in nodes if n["Node Type"] == "Seq Scan"}
+
+        for node in nodes:
+            relation = node.get("Relation Name")
+            if node["Node Type"] == "Seq Scan" and node.get("Filter"):
+                for word in re.findall(r"\b(\w+)\b", node["Filter"]):
+                    if word in columns.get(relation, ()):
+                        wanted.add((relation, word))
+            for key in ("Hash Cond", "Merge Cond", "Join Filter"):
+                for alias, column in re.findall(r"\b(\w+)\.(\w+)\b", node.get(key, "")):
+                    relation = aliases.get(alias)
+                    if relation in seq_scanned and column in columns.get(relation, ()):
+                        wanted.add((relation, column))
+
+    return [
+        f"CREATE INDEX ON {relation} ({column})"
+        for relation, column in sorted(wanted - indexed)
+    ]
+
+
+def evaluate_candidates(conn, candidates, current, repeat):
+    for ddl in candidates:
+        with conn.transaction(force_rollback=True):
+            with conn.cursor() as cur:
+                cur.execute(ddl)
+            trial = run_catalogue(conn, repeat)
+
+        print(f"\n--- CANDIDATE: {ddl} ---")
+        helped = False
+        for name, result in trial.items():
+            before = current[name]["execution_ms"]
+            after = result["execution_ms"]
+            if after < before * 0.9:
+                helped = True
+                print(f"{name:<36} {before:>9.3f}ms -> {after:>9.3f}ms ({before / after:.1f}x)")
+        if not helped:
+            print("no query improved by more than 10%")
+
+
+# =========================
+# Main
+# =========================
+def reseed(conn, users):
+    with conn.cursor() as cur:
+        cur.execute("TRUNCATE user_spend, payments, orders, users RESTART IDENTITY")
+    conn.autocommit = False
+    load(conn, users, orders_per_user=5, payment_ratio=0.8, days=365,
+         defer_indexes=True, seed=7)
+    conn.autocommit = True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EXPLAIN-based query plan regression harness")
+    parser.add_argument("--reseed", type=int, metavar="USERS",
+                        help="truncate and bulk-load this many users (plus orders/payments) first")
+    parser.add_argument("--repeat", type=int, default=3, help="EXPLAIN ANALYZE runs per query")
+    parser.add_argument("--save", help="write results to this baseline file")
+    parser.add_argument("--compare", help="baseline file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="relative execution-time increase to flag")
+    parser.add_argument("--min-ms", type=float, default=1.0,
+                        help="ignore timing changes smaller than this")
+    parser.add_argument("--candidate", action="append", default=[],
+                        help="CREATE INDEX statement to evaluate (repeatable)")
+    parser.add_argument("--suggest-indexes", action="store_true",
+                        help="derive candidate indexes from the current plans and evaluate them")
+    parser.add_argument("--partition-orders", action="store_true",
+                        help="create orders range-partitioned by month (new tables only)")
+    args = parser.parse_args()
+
+    conn = get_connection()
+    create_tables(conn, partitioned=args.partition_orders)
+    if args.reseed:
+        reseed(conn, args.reseed)
+
+    results = run_catalogue(conn, args.repeat)
+
+    print(f"\n{'query':<36} {'exec ms':>9} {'plan ms':>8} {'hit':>8} {'read':>8}  scans")
+    for name, r in results.items():
+        scans = ", ".join(f"{rel}:{scan}" for rel, scan in r["scans"].items())
+        print(f"{name:<36} {r['execution_ms']:>9.3f} {r['planning_ms']:>8.3f} "
+              f"{r['shared_hit_blocks']:>8} {r['shared_read_blocks']:>8}  {scans}")
+
+    status = 0
+    if args.compare:
+        with open(args.compare) as fp:
+            baseline = json.load(fp)["queries"]
+        findings = compare(results, baseline, args.threshold, args.min_ms)
+        print("\n--- REGRESSIONS ---" if findings else "\nNo plan or timing regressions")
+        for finding in findings:
+            print(finding)
+        status = 1 if findings else 0
+
+    if args.save:
+        with open(args.save, "w") as fp:
+            json.dump({
+                "meta": {"timestamp": datetime.now(timezone.utc).isoformat(), "repeat": args.repeat},
+                "queries": results,
+            }, fp, indent=2, default=str)
+        print(f"\nBaseline written to {args.save}")
+
+    candidates = list(args.candidate)
+    if args.suggest_indexes:
+        candidates += suggest_indexes(conn, results)
+    if candidates:
+        evaluate_candidates(conn, candidates, results, args.repeat)
+
+    conn.close()
+    raise SystemExit(status)
+
+
+if __name__ == "__main__":
+    main()
@@ -8,9 +8,24 @@ Covers:
 - Complex queries (JOIN, LEFT JOIN, Subquery, CTE)
 - Index creation
 - EXPLAIN ANALYZE
+- Connection pooling (sync + asyncio)
+- Streaming results (server-side cursors, CSV / NDJSON export)
+- Pipeline mode and prepared statements
+- Range-partitioned orders and a trigger-maintained spend rollup
+- Keyset-paginated order history
 """
 
+import argparse
+import base64
+import binascii
+import json
+import uuid
+from datetime import date, datetime
+
 import psycopg
+from psycopg.conninfo import make_conninfo
+from psycopg.rows import dict_row
+from psycopg_pool import AsyncConnectionPool, ConnectionPool
 
 
 # =========================
@@ -25,40 +40,320 @@ DB_CONFIG = {
 }
 
 
+POOL_CONFIG = {
+    "min_size": 2,          # connections opened up front and kept warm
+    "max_size": 10,
+    "timeout": 30,          # seconds a caller may wait for a free connection
+    "max_lifetime": 3600,   # recycle connections after an hour
+    "max_idle": 300,        # close surplus connections idle this long
+}
+
+
 def get_connection():
     conn = psycopg.connect(**DB_CONFIG)
     conn.autocommit = True
     return conn
 
 
+# =========================
+# Connection Pools
+# =========================
+# One pool per worker process: TCP setup, auth and backend fork are paid
+# when the pool opens, not on every query. Connections are health-checked
+# on checkout and recycled after max_lifetime.
+_pool = None
+_async_pool = None
+
+
+def _configure(conn):
+    conn.autocommit = True
+    conn.prepare_threshold = PREPARE_THRESHOLD
+
+
+async def _configure_async(conn):
+    await conn.set_autocommit(True)
+    conn.prepare_threshold = PREPARE_THRESHOLD
+
+
+def create_pool(**overrides):
+    pool = ConnectionPool(
+        make_conninfo(**DB_CONFIG),
+        configure=_configure,
+        check=ConnectionPool.check_connection,
+        open=False,
+        name="app_db",
+        **{**POOL_CONFIG, **overrides},
+    )
+    pool.open(wait=True)
+    return pool
+
+
+async def create_async_pool(**overrides):
+    pool = AsyncConnectionPool(
+        make_conninfo(**DB_CONFIG),
+        configure=_configure_async,
+        check=AsyncConnectionPool.check_connection,
+        open=False,
+        name="app_db_async",
+        **{**POOL_CONFIG, **overrides},
+    )
+    await pool.open(wait=True)
+    return pool
+
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        _pool = create_pool()
+    return _pool
+
+
+async def get_async_pool():
+    global _async_pool
+    if _async_pool is None:
+        _async_pool = await create_async_pool()
+    return _async_pool
+
+
+def close_pool():
+    """Close the shared pool; the next get_pool() opens a fresh one."""
+    global _pool
+    if _pool is not None:
+        _pool.close()
+        _pool = None
+
+
+async def close_async_pool():
+    global _async_pool
+    if _async_pool is not None:
+        await _async_pool.close()
+        _async_pool = None
+
+
+def pool_stats(pool):
+    """psycopg_pool counters plus derived in-use and average wait."""
+    stats = pool.get_stats()
+    size = stats.get("pool_size", 0)
+    available = stats.get("pool_available", 0)
+    requests = stats.get("requests_num", 0)
+    return {
+        **stats,
+        "in_use": size - available,
+        "waiting": stats.get("requests_waiting", 0),
+        "avg_wait_ms": round(stats.get("requests_wait_ms", 0) / requests, 2) if requests else 0.0,
+    }
+
+
 # =========================
 # Schema Creation
 # =========================
-def create_tables(conn):
-    with conn.cursor() as cur:
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS users (
-                id SERIAL PRIMARY KEY,
-                name VARCHAR(100) NOT NULL,
-                email VARCHAR(150) UNIQUE NOT NULL
-            );
+# Range-partition orders by month of created_at. Only takes effect when the
+# orders table does not exist yet. PostgreSQL requires the partition key in
+# any key a foreign key references, so in this mode payments.order_id is
+# indexed but not FK-enforced.
+PARTITION_ORDERS = False
+PARTITION_MONTHS_BACK = 12
+PARTITION_MONTHS_AHEAD = 3
+
+USERS_DDL = """
+    CREATE TABLE IF NOT EXISTS users (
+        id SERIAL PRIMARY KEY,
+        name VARCHAR(100) NOT NULL,
+        email VARCHAR(150) UNIQUE NOT NULL
+    );
+"""
 
-            CREATE TABLE IF NOT EXISTS orders (
-                id SERIAL PRIMARY KEY,
-                user_id INT REFERENCES users(id),
-                amount NUMERIC(10,2),
-                created_at TIMESTAMP DEFAULT NOW()
-            );
+ORDERS_DDL = """
+    CREATE TABLE IF NOT EXISTS orders (
+        id SERIAL PRIMARY KEY,
+        user_id INT REFERENCES users(id),
+        amount NUMERIC(10,2),
+        created_at TIMESTAMP DEFAULT NOW()
+    );
+
+    CREATE TABLE IF NOT EXISTS payments (
+        id SERIAL PRIMARY KEY,
+        order_id INT REFERENCES orders(id),
+        status VARCHAR(50)
+    );
+"""
 
-            CREATE TABLE IF NOT EXISTS payments (
-                id SERIAL PRIMARY KEY,
-                order_id INT REFERENCES orders(id),
-                status VARCHAR(50)
+PARTITIONED_ORDERS_DDL = """
+    CREATE TABLE IF NOT EXISTS orders (
+        id SERIAL,
+        user_id INT REFERENCES users(id),
+        amount NUMERIC(10,2),
+        created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+        PRIMARY KEY (id, created_at)
+    ) PARTITION BY RANGE (created_at);
+
+    CREATE TABLE IF NOT EXISTS orders_default PARTITION OF orders DEFAULT;
+
+    CREATE TABLE IF NOT EXISTS payments (
+        id SERIAL PRIMARY KEY,
+        order_id INT,
+        status VARCHAR(50)
+    );
+
+    -- Monthly partitions orders_YYYY_MM. Rows that already landed in the
+    -- default partition for a new month are moved into it before attaching.
+    -- Kept ahead of time by maintain_order_partitions() on the write path and
+    -- by `python postgress.py --ensure-partitions` from cron (or pg_cron).
+    CREATE OR REPLACE FUNCTION ensure_orders_partitions(start_month DATE, months INT)
+    RETURNS INT LANGUAGE plpgsql AS $$
+    DECLARE
+        month_start DATE;
+        month_end DATE;
+        part TEXT;
+        created INT := 0;
+    BEGIN
+        FOR i IN 0 .. months - 1 LOOP
+            month_start := (date_trunc('month', start_month) + make_interval(months => i))::date;
+            month_end := (month_start + INTERVAL '1 month')::date;
+            part := format('orders_%s', to_char(month_start, 'YYYY_MM'));
+            CONTINUE WHEN to_regclass(part) IS NOT NULL;
+
+            EXECUTE format('CREATE TABLE %I (LIKE orders INCLUDING DEFAULTS)', part);
+            EXECUTE format(
+                'WITH moved AS (DELETE FROM orders_default '
+                'WHERE created_at >= %L AND created_at < %L RETURNING *) '
+                'INSERT INTO %I SELECT * FROM moved',
+                month_start, month_end, part
+            );
+            EXECUTE format(
+                'ALTER TABLE orders ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                part, month_start, month_end
             );
-        """)
+            created := created + 1;
+        END LOOP;
+        RETURN created;
+    END $$;
+"""
+
+# Per-user spend kept current by statement-level triggers that aggregate
+# each statement's transition table, so a COPY of a million orders costs one
+# GROUP BY rather than a million row updates. Dashboards read O(users) rows
+# instead of re-aggregating orders.
+ROLLUP_DDL = """
+    CREATE TABLE IF NOT EXISTS user_spend (
+        user_id INT PRIMARY KEY REFERENCES users(id),
+        total NUMERIC(14,2) NOT NULL DEFAULT 0,
+        order_count BIGINT NOT NULL DEFAULT 0
+    );
+
+    CREATE OR REPLACE FUNCTION user_spend_rollup() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            UPDATE user_spend s
+            SET total = s.total - d.total, order_count = s.order_count - d.order_count
+            FROM (
+                SELECT user_id, SUM(COALESCE(amount, 0)) AS total, COUNT(*) AS order_count
+                FROM old_rows WHERE user_id IS NOT NULL GROUP BY user_id
+            ) d
+            WHERE s.user_id = d.user_id;
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            INSERT INTO user_spend (user_id, total, order_count)
+            SELECT user_id, SUM(COALESCE(amount, 0)), COUNT(*)
+            FROM new_rows WHERE user_id IS NOT NULL GROUP BY user_id
+            ON CONFLICT (user_id) DO UPDATE
+            SET total = user_spend.total + EXCLUDED.total,
+                order_count = user_spend.order_count + EXCLUDED.order_count;
+        END IF;
+        RETURN NULL;
+    END $$;
+
+    CREATE OR REPLACE TRIGGER orders_spend_insert AFTER INSERT ON orders
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION user_spend_rollup();
+    CREATE OR REPLACE TRIGGER orders_spend_update AFTER UPDATE ON orders
+        REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION user_spend_rollup();
+    CREATE OR REPLACE TRIGGER orders_spend_delete AFTER DELETE ON orders
+        REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION user_spend_rollup();
+"""
+
+# Covering indexes for the user->orders->payments join paths: the joins and
+# the spend aggregate are answered from the index without heap visits.
+# idx_orders_user_created also serves keyset pagination (see below).
+COVERING_INDEXES_DDL = """
+    CREATE INDEX IF NOT EXISTS idx_payments_order_id_cover
+        ON payments (order_id) INCLUDE (status);
+    CREATE INDEX IF NOT EXISTS idx_orders_user_created
+        ON orders (user_id, created_at DESC, id DESC) INCLUDE (amount);
+"""
+
+
+def create_tables(conn, partitioned=PARTITION_ORDERS):
+    with conn.cursor() as cur:
+        cur.execute("SELECT to_regclass('user_spend') IS NULL")
+        new_rollup = cur.fetchone()[0]
+
+        cur.execute(USERS_DDL)
+        cur.execute(PARTITIONED_ORDERS_DDL if partitioned else ORDERS_DDL)
+        cur.execute(ROLLUP_DDL)
+        cur.execute(COVERING_INDEXES_DDL)
+    if partitioned:
+        ensure_order_partitions(conn)
+    if new_rollup:
+        # Backfill orders that predate the rollup triggers.
+        rebuild_user_spend(conn)
     print("✅ Tables created")
 
 
+def ensure_order_partitions(conn, months_back=PARTITION_MONTHS_BACK,
+                            months_ahead=PARTITION_MONTHS_AHEAD):
+    with conn.cursor() as cur:
+        cur.execute(
+            "SELECT ensure_orders_partitions("
+            "(date_trunc('month', now()) - make_interval(months => %s))::date, %s)",
+            (months_back, months_back + months_ahead + 1),
+        )
+        return cur.fetchone()[0]
+
+
+def orders_partitioned(conn):
+    with conn.cursor() as cur:
+        cur.execute("SELECT relkind = 'p' FROM pg_class WHERE oid = to_regclass('orders')")
+        row = cur.fetchone()
+        return bool(row and row[0])
+
+
+_partitions_checked_for = None
+
+
+def maintain_order_partitions(conn):
+    """Create upcoming monthly partitions, at most once per month per process.
+
+    Called from the order write path so inserts keep landing in monthly
+    partitions rather than piling up in orders_default once the months
+    created by create_tables run out.
+    """
+    global _partitions_checked_for
+    month = date.today().replace(day=1)
+    if _partitions_checked_for == month:
+        return 0
+    created = ensure_order_partitions(conn, months_back=0) if orders_partitioned(conn) else 0
+    _partitions_checked_for = month
+    return created
+
+
+def rebuild_user_spend(conn):
+    """Recompute user_spend from orders, e.g. after loading with triggers off."""
+    with conn.transaction():
+        with conn.cursor() as cur:
+            cur.execute("LOCK TABLE orders IN SHARE MODE")
+            cur.execute("TRUNCATE user_spend")
+            cur.execute("""
+                INSERT INTO user_spend (user_id, total, order_count)
+                SELECT user_id, SUM(COALESCE(amount, 0)), COUNT(*)
+                FROM orders WHERE user_id IS NOT NULL
+                GROUP BY user_id
+            """)
+
+
 # =========================
 # Seed Data
 # =========================
@@ -98,57 +393,208 @@ def seed_data(conn):
 # =========================
 # Complex Queries
 # =========================
-def run_queries(conn):
+REPORT_QUERIES = {
+    "INNER JOIN": """
+        SELECT u.name, o.amount
+        FROM users u
+        JOIN orders o ON u.id = o.user_id
+    """,
+    "LEFT JOIN (users without orders)": """
+        SELECT u.name
+        FROM users u
+        LEFT JOIN orders o ON u.id = o.user_id
+        WHERE o.id IS NULL
+    """,
+    "SUBQUERY": """
+        SELECT name
+        FROM users
+        WHERE id IN (
+            SELECT user_id FROM orders WHERE amount > 500
+        )
+    """,
+    "CTE (Total Spend per User)": """
+        WITH total_spend AS (
+            SELECT user_id, SUM(amount) AS total
+            FROM orders
+            GROUP BY user_id
+        )
+        SELECT u.name, t.total
+        FROM total_spend t
+        JOIN users u ON u.id = t.user_id
+    """,
+    "ROLLUP (Total Spend per User)": """
+        SELECT u.name, s.total
+        FROM user_spend s
+        JOIN users u ON u.id = s.user_id
+    """,
+    "MULTI TABLE JOIN": """
+        SELECT u.name, o.id, p.status
+        FROM users u
+        JOIN orders o ON u.id = o.user_id
+        JOIN payments p ON o.id = p.order_id
+    """,
+}
+
+
+def run_queries(conn, limit=20):
+    for title, sql in REPORT_QUERIES.items():
+        print(f"\n--- {title} ---")
+        shown = 0
+        for row in stream_query(conn, sql):
+            if shown == limit:
+                print("...")
+                break
+            print(row)
+            shown += 1
+
+
+# =========================
+# Streaming Results
+# =========================
+# Named (server-side) cursors keep the result set in PostgreSQL and pull it
+# over in fetchmany batches, so memory stays constant however many rows a
+# report returns.
+STREAM_BATCH_SIZE = 2000
+
+
+def stream_query(conn, sql, params=None, batch_size=STREAM_BATCH_SIZE, row_factory=None):
+    """Yield result rows one at a time, fetched ``batch_size`` at a time."""
+    # Server-side cursors live inside a transaction; closing the generator
+    # early ends it and releases the cursor.
+    with conn.transaction():
+        with conn.cursor(name=f"stream_{uuid.uuid4().hex}", row_factory=row_factory) as cur:
+            cur.itersize = batch_size
+            cur.execute(sql, params)
+            while True:
+                rows = cur.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield from rows
+
+
+def export_csv(conn, sql, fp, params=None):
+    """Write a query's result as CSV (with header) to binary file ``fp``.
+
+    COPY streams the rows in chunks straight from the server, so nothing is
+    accumulated client-side.
+    """
     with conn.cursor() as cur:
+        with cur.copy(f"COPY ({sql}) TO STDOUT (FORMAT CSV, HEADER)", params) as copy:
+            for chunk in copy:
+                fp.write(chunk)
+
+
+def export_ndjson(conn, sql, fp, params=None, batch_size=STREAM_BATCH_SIZE):
+    """Write one JSON object per row to text file ``fp``; returns rows written."""
+    written = 0
+    for row in stream_query(conn, sql, params, batch_size, row_factory=dict_row):
+        fp.write(json.dumps(row, default=str) + "\n")
+        written += 1
+    return written
+
+
+# =========================
+# Pipelined Writes + Prepared Reads
+# =========================
+# One statement creates an order and its payment (the payment's order_id
+# comes from the CTE, not a read-back), and executemany() sends a whole batch
+# of them in pipeline mode: one network round trip instead of two per order.
+INSERT_ORDER_WITH_PAYMENT = """
+    WITH new_order AS (
+        INSERT INTO orders (user_id, amount) VALUES (%s, %s) RETURNING id
+    )
+    INSERT INTO payments (order_id, status)
+    SELECT id, %s FROM new_order
+    RETURNING order_id, id
+"""
+
+ORDERS_BY_USER = "SELECT * FROM orders WHERE user_id = %s"
+
+# Hot parameterised statements are prepared server-side after this many
+# executions on a connection (psycopg's default is 5).
+PREPARE_THRESHOLD = 2
+
+
+def create_orders(conn, orders):
+    """Insert (user_id, amount, payment_status) tuples in one pipeline.
+
+    Returns ``[(order_id, payment_id), ...]`` in input order.
+    """
+    maintain_order_partitions(conn)
+    with conn.cursor() as cur:
+        with conn.pipeline():
+            cur.executemany(INSERT_ORDER_WITH_PAYMENT, orders, returning=True)
+        ids = []
+        for _ in cur.results():
+            ids.append(cur.fetchone())
+        return ids
 
-        print("\n--- INNER JOIN ---")
-        cur.execute("""
-            SELECT u.name, o.amount
-            FROM users u
-            JOIN orders o ON u.id = o.user_id
-        """)
-        print(cur.fetchall())
-
-        print("\n--- LEFT JOIN (users without orders) ---")
-        cur.execute("""
-            SELECT u.name
-            FROM users u
-            LEFT JOIN orders o ON u.id = o.user_id
-            WHERE o.id IS NULL
-        """)
-        print(cur.fetchall())
-
-        print("\n--- SUBQUERY ---")
-        cur.execute("""
-            SELECT name
-            FROM users
-            WHERE id IN (
-                SELECT user_id FROM orders WHERE amount > 500
-            )
-        """)
-        print(cur.fetchall())
-
-        print("\n--- CTE (Total Spend per User) ---")
-        cur.execute("""
-            WITH total_spend AS (
-                SELECT user_id, SUM(amount) AS total
-                FROM orders
-                GROUP BY user_id
-            )
-            SELECT u.name, t.total
-            FROM total_spend t
-            JOIN users u ON u.id = t.user_id
-        """)
-        print(cur.fetchall())
 
-        print("\n--- MULTI TABLE JOIN ---")
-        cur.execute("""
-            SELECT u.name, o.id, p.status
-            FROM users u
-            JOIN orders o ON u.id = o.user_id
-            JOIN payments p ON o.id = p.order_id
-        """)
-        print(cur.fetchall())
+def get_orders_for_user(conn, user_id):
+    with conn.cursor() as cur:
+        cur.execute(ORDERS_BY_USER, (user_id,), prepare=True)
+        return cur.fetchall()
+
+
+# =========================
+# Keyset Pagination
+# =========================
+# A user's orders newest first, keyed on (created_at, id) so every page is an
+# index range scan on idx_orders_user_created starting right after the last
+# row seen: page 10,000 costs the same as page 1, unlike OFFSET.
+ORDER_PAGE_SQL = """
+    SELECT o.id, o.amount, o.created_at, p.status
+    FROM orders o
+    LEFT JOIN LATERAL (
+        SELECT status FROM payments
+        WHERE order_id = o.id
+        ORDER BY id DESC
+        LIMIT 1
+    ) p ON TRUE
+    WHERE o.user_id = %s {after}
+    ORDER BY o.created_at DESC, o.id DESC
+    LIMIT %s
+"""
+
+
+def order_page_query(user_id, limit, after=None):
+    """SQL and params for one page; ``after`` is the last (created_at, id) seen."""
+    if after is None:
+        return ORDER_PAGE_SQL.format(after=""), (user_id, limit)
+    created_at, order_id = after
+    return (
+        ORDER_PAGE_SQL.format(after="AND (o.created_at, o.id) < (%s, %s)"),
+        (user_id, created_at, order_id, limit),
+    )
+
+
+def encode_page_token(created_at, order_id):
+    raw = json.dumps([created_at.isoformat(), order_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_page_token(token):
+    """Inverse of encode_page_token; raises ValueError on a malformed token."""
+    try:
+        created_at, order_id = json.loads(base64.urlsafe_b64decode(token.encode()))
+        return datetime.fromisoformat(created_at), int(order_id)
+    except (binascii.Error, TypeError, ValueError) as exc:
+        raise ValueError("invalid page token") from exc
+
+
+async def fetch_order_page(conn, user_id, limit=50, token=None):
+    """One page of orders with payment status, plus the next page token."""
+    after = decode_page_token(token) if token else None
+    sql, params = order_page_query(user_id, limit + 1, after)
+    async with conn.cursor(row_factory=dict_row) as cur:
+        await cur.execute(sql, params)
+        rows = await cur.fetchall()
+
+    next_token = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_token = encode_page_token(rows[-1]["created_at"], rows[-1]["id"])
+    return rows, next_token
 
 
 # =========================
@@ -156,9 +602,9 @@ def run_queries(conn):
 # =========================
 def optimize_queries(conn):
     with conn.cursor() as cur:
-        cur.execute(
-            "CREATE INDEX IF NOT EXISTS idx_orders_user_id ON orders(user_id);"
-        )
+        # user_id lookups use idx_orders_user_created (leading column user_id);
+        # a separate single-column index would only add write cost.
+        cur.execute("DROP INDEX IF EXISTS idx_orders_user_id;")
 
         print("\n--- EXPLAIN ANALYZE ---")
         cur.execute(
@@ -172,14 +618,31 @@ def optimize_queries(conn):
 # Main Execution
 # =========================
 def main():
-    conn = get_connection()
-
-    create_tables(conn)
-    seed_data(conn)
-    run_queries(conn)
-    optimize_queries(conn)
-
-    conn.close()
+    parser = argparse.ArgumentParser(description="Day 7 PostgreSQL walkthrough")
+    parser.add_argument("--partition-orders", action="store_true",
+                        help="create orders range-partitioned by month (new tables only)")
+    parser.add_argument("--ensure-partitions", action="store_true",
+                        help="only create upcoming monthly order partitions, e.g. from cron")
+    args = parser.parse_args()
+
+    pool = get_pool()
+
+    if args.ensure_partitions:
+        with pool.connection() as conn:
+            created = ensure_order_partitions(conn) if orders_partitioned(conn) else 0
+        print(f"✅ {created} order partitions created")
+        close_pool()
+        return
+
+    with pool.connection() as conn:
+        create_tables(conn, partitioned=args.partition_orders)
+        seed_data(conn)
+        run_queries(conn)
+        optimize_queries(conn)
+
+    print("\n--- POOL STATS ---")
+    print(pool_stats(pool))
+    close_pool()
     print("\n🎯 Day 7 PostgreSQL tasks completed successfully")
 
 
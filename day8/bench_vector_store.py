@@ -0,0 +1,126 @@
+# ==========================================
+# Vector store backends: recall, QPS and memory vs. corpus size
+# ==========================================
+# Builds each vector_store backend over synthetic clustered unit vectors
+# (MiniLM-sized by default), then measures recall@k against exact ground
+# truth, single-query and batched QPS, on-disk size and resident memory
+# growth. No embedding model is loaded.
+#
+#   python bench_vector_store.py --sizes 1000 10000 100000 --queries 500 --k 10
+
+import argparse
+import gc
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from vector_store import open_store
+
+
+def make_corpus(size, dim, clusters, rng):
+    centres = rng.standard_normal((clusters, dim)).astype(np.float32)
+    assignment = rng.integers(0, clusters, size)
+    vectors = centres[assignment] + 0.5 * rng.standard_normal((size, dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors
+
+
+def rss_bytes():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        import resource
+
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def disk_bytes(path):
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, files in os.walk(path)
+        for name in files
+    )
+
+
+def recall_at_k(found, truth):
+    hits = sum(len(set(f) & set(t)) for f, t in zip(found, truth))
+    return hits / (len(truth) * len(truth[0]))
+
+
+def bench_backend(backend, corpus, ids, queries, truth, k, workdir):
+    path = os.path.join(workdir, backend)
+    gc.collect()
+    rss_before = rss_bytes()
+
+    started = time.perf_counter()
+    store = open_store(backend, path, collection_name="bench")
+    store.add(ids, corpus)
+    store.save()
+    build = time.perf_counter() - started
+    rss_delta = rss_bytes() - rss_before
+
+    started = time.perf_counter()
+    found = [store.query(q, k=k)["ids"][0] for q in queries]
+    single_qps = len(queries) / (time.perf_counter() - started)
+
+    started = time.perf_counter()
+    store.query(queries, k=k)
+    batch_qps = len(queries) / (time.perf_counter() - started)
+
+    return {
+        "build_s": build,
+        "recall": recall_at_k(found, truth),
+        "single_qps": single_qps,
+        "batch_qps": batch_qps,
+        "disk_mb": disk_bytes(path) / 2**20,
+        "rss_mb": rss_delta / 2**20,
+    }
+
+
+def run(sizes, backends, dim, n_queries, k, clusters, seed):
+    rng = np.random.default_rng(seed)
+    print(
+        f"{'backend':>8} {'size':>9} {'build s':>9} {f'recall@{k}':>10} "
+        f"{'qps(1)':>10} {'qps(batch)':>11} {'disk MB':>9} {'rss MB':>8}"
+    )
+    for size in sizes:
+        corpus = make_corpus(size, dim, clusters, rng)
+        queries = make_corpus(n_queries, dim, clusters, rng)
+        ids = [f"doc{i}" for i in range(size)]
+        scores = queries @ corpus.T
+        top = np.argsort(-scores, axis=1)[:, :k]
+        truth = [[ids[i] for i in row] for row in top]
+        del scores
+
+        workdir = tempfile.mkdtemp(prefix="bench_vector_store_")
+        try:
+            for backend in backends:
+                r = bench_backend(backend, corpus, ids, queries, truth, k, workdir)
+                print(
+                    f"{backend:>8} {size:>9} {r['build_s']:>9.2f} {r['recall']:>10.3f} "
+                    f"{r['single_qps']:>10.0f} {r['batch_qps']:>11.0f} "
+                    f"{r['disk_mb']:>9.1f} {r['rss_mb']:>8.1f}"
+                )
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vector store recall/QPS/memory vs. corpus size")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--backends", nargs="+", default=["chroma", "numpy", "hnsw"])
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--clusters", type=int, default=64)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    run(args.sizes, args.backends, args.dim, args.queries, args.k, args.clusters, args.seed)
+
+
+if __name__ == "__main__":
+    main()
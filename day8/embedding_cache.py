@@ -0,0 +1,156 @@
+# ==========================================
+# Day 8: Persistent embedding cache
+# ==========================================
+# Embeddings are keyed by (model name, sha256 of the text). Each model gets
+# two append-only files under the cache directory:
+#   <model>.f32  raw float32 rows, memory-mapped for reads
+#   <model>.idx  header line "model dim", then one hex digest per row
+# Rows are written before their digests, so a crash mid-append leaves at
+# worst some unreferenced trailing bytes, which are ignored on load.
+# Recently used vectors are also kept in a bounded in-memory LRU hot set.
+
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+DEFAULT_CACHE_DIR = "./embedding_cache"
+DEFAULT_HOT_SIZE = 10_000
+
+
+def text_digest(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    def __init__(self, model_name, directory=DEFAULT_CACHE_DIR, hot_size=DEFAULT_HOT_SIZE):
+        self.model_name = model_name
+        self.hot_size = hot_size
+        os.makedirs(directory, exist_ok=True)
+        slug = re.sub(r"[^A-Za-z0-9._-]+", "_", model_name)
+        self.matrix_path = os.path.join(directory, f"{slug}.f32")
+        self.index_path = os.path.join(directory, f"{slug}.idx")
+
+        self.dim = None
+        self._rows = {}           # digest -> row number in the matrix file
+        self._hot = OrderedDict() # digest -> vector, most recent last
+        self._matrix = None       # np.memmap over the persisted rows
+        self._lock = threading.Lock()
+        self.hot_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._load()
+
+    # -----------------------------
+    # Persistence
+    # -----------------------------
+    def _load(self):
+        if not os.path.exists(self.index_path):
+            return
+        with open(self.index_path, encoding="ascii") as f:
+            lines = f.read().split("\n")
+        # The last element is "" when the file ends cleanly, else a torn line
+        header, digests = lines[0].rsplit(" ", 1), lines[1:-1]
+        if len(header) != 2 or header[0] != self.model_name:
+            raise ValueError(f"{self.index_path} does not belong to model {self.model_name!r}")
+        self.dim = int(header[1])
+        row_bytes = self.dim * 4
+        stored = os.path.getsize(self.matrix_path) // row_bytes if os.path.exists(self.matrix_path) else 0
+        if stored < len(digests) or lines[-1]:
+            digests = digests[:stored]
+            with open(self.index_path, "w", encoding="ascii") as f:
+                f.write(lines[0] + "\n" + "".join(f"{d}\n" for d in digests))
+        for row, digest in enumerate(digests[:stored]):
+            self._rows[digest] = row
+        self._remap()
+
+    def _remap(self):
+        count = len(self._rows)
+        self._matrix = (
+            np.memmap(self.matrix_path, dtype=np.float32, mode="r", shape=(count, self.dim))
+            if count else None
+        )
+
+    def _append(self, digests, vectors):
+        if self.dim is None:
+            self.dim = vectors.shape[1]
+            with open(self.index_path, "w", encoding="ascii") as f:
+                f.write(f"{self.model_name} {self.dim}\n")
+        elif vectors.shape[1] != self.dim:
+            raise ValueError(f"expected {self.dim}-d vectors, got {vectors.shape[1]}-d")
+        start = len(self._rows)
+        with open(self.matrix_path, "ab") as f:
+            # Drop any torn tail left by an interrupted append
+            f.truncate(start * self.dim * 4)
+            f.write(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+        with open(self.index_path, "a", encoding="ascii") as f:
+            f.write("".join(f"{d}\n" for d in digests))
+        for offset, digest in enumerate(digests):
+            self._rows[digest] = start + offset
+        self._remap()
+
+    # -----------------------------
+    # Lookup / store
+    # -----------------------------
+    def _remember(self, digest, vector):
+        self._hot[digest] = vector
+        self._hot.move_to_end(digest)
+        while len(self._hot) > self.hot_size:
+            self._hot.popitem(last=False)
+
+    def get_many(self, texts):
+        """Return (vectors, missing) where missing lists indexes not cached.
+
+        ``vectors`` holds ``None`` for each missing position.
+        """
+        vectors, missing = [], []
+        with self._lock:
+            for i, text in enumerate(texts):
+                digest = text_digest(text)
+                vector = self._hot.get(digest)
+                if vector is not None:
+                    self._hot.move_to_end(digest)
+                    self.hot_hits += 1
+                else:
+                    row = self._rows.get(digest)
+                    if row is not None:
+                        vector = np.array(self._matrix[row])
+                        self._remember(digest, vector)
+                        self.disk_hits += 1
+                    else:
+                        missing.append(i)
+                        self.misses += 1
+                vectors.append(vector)
+        return vectors, missing
+
+    def put_many(self, texts, vectors):
+        with self._lock:
+            new_digests, new_rows, seen = [], [], set()
+            for text, vector in zip(texts, vectors):
+                digest = text_digest(text)
+                if digest not in self._rows and digest not in seen:
+                    seen.add(digest)
+                    new_digests.append(digest)
+                    new_rows.append(vector)
+                self._remember(digest, np.asarray(vector, dtype=np.float32))
+            if new_digests:
+                self._append(new_digests, np.stack(new_rows))
+
+    def stats(self):
+        hits = self.hot_hits + self.disk_hits
+        lookups = hits + self.misses
+        dim = self.dim or 0
+        return {
+            "model": self.model_name,
+            "entries": len(self._rows),
+            "hot_entries": len(self._hot),
+            "hot_hits": self.hot_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "disk_bytes": len(self._rows) * dim * 4,
+            "hot_bytes": len(self._hot) * dim * 4,
+        }
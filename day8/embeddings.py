@@ -0,0 +1,89 @@
+# ==========================================
+# Day 8: Batched embedding generation
+# ==========================================
+# Encodes texts in batches straight to contiguous float32 NumPy arrays
+# (L2-normalised), so large ingests are bound by the model, not by per-call
+# dispatch or .tolist() conversion into Python floats. With an
+# EmbeddingCache attached, previously seen texts skip the model entirely and
+# the model itself is only loaded once something actually misses.
+
+from itertools import islice
+
+import numpy as np
+from sentence_transformers import SentenceTransformer
+
+MODEL_NAME = "all-MiniLM-L6-v2"
+BATCH_SIZE = 256          # texts per forward pass
+INGEST_CHUNK_SIZE = 4096  # texts embedded and written to the store per step
+
+
+class Embedder:
+    def __init__(self, model_name=MODEL_NAME, batch_size=BATCH_SIZE, device=None, cache=None):
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.device = device
+        self.cache = cache
+        self._model = None
+
+    @property
+    def model(self):
+        if self._model is None:
+            self._model = SentenceTransformer(self.model_name, device=self.device)
+        return self._model
+
+    @property
+    def dim(self):
+        if self.cache is not None and self.cache.dim is not None:
+            return self.cache.dim
+        return self.model.get_sentence_embedding_dimension()
+
+    def embed(self, texts, batch_size=None):
+        """Return a (len(texts), dim) float32 array of unit-length vectors."""
+        texts = list(texts)
+        if not texts:
+            return np.empty((0, self.dim), dtype=np.float32)
+        if self.cache is None:
+            return self._encode(texts, batch_size)
+
+        vectors, missing = self.cache.get_many(texts)
+        if missing:
+            fresh = self._encode([texts[i] for i in missing], batch_size)
+            self.cache.put_many([texts[i] for i in missing], fresh)
+            for i, vector in zip(missing, fresh):
+                vectors[i] = vector
+        return np.stack(vectors).astype(np.float32, copy=False)
+
+    def _encode(self, texts, batch_size=None):
+        vectors = self.model.encode(
+            texts,
+            batch_size=batch_size or self.batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=False,
+        )
+        return np.ascontiguousarray(vectors, dtype=np.float32)
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def ingest(store, embedder, documents, ids, chunk_size=INGEST_CHUNK_SIZE):
+    """Embed and upsert (id, document) pairs chunk by chunk; returns the count.
+
+    ``store`` is any vector_store.VectorStore. ``documents`` and ``ids`` may
+    be iterators, so a corpus larger than memory streams through with one
+    chunk resident at a time.
+    """
+    total = 0
+    for chunk in chunked(zip(ids, documents), chunk_size):
+        chunk_ids = [doc_id for doc_id, _ in chunk]
+        chunk_docs = [doc for _, doc in chunk]
+        store.upsert(chunk_ids, embedder.embed(chunk_docs), chunk_docs)
+        total += len(chunk)
+    return total
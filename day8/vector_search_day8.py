@@ -2,26 +2,37 @@
 # Day 8: ChromaDB + Embeddings + Semantic Search
 # ==========================================
 
+import os
+
 import chromadb
 from chromadb.config import Settings
-from sentence_transformers import SentenceTransformer
 
-# -----------------------------
-# 1. Load Embedding Model
-# -----------------------------
-model = SentenceTransformer("all-MiniLM-L6-v2")
+from embedding_cache import EmbeddingCache
+from embeddings import Embedder, ingest
+from vector_store import ChromaStore, open_store
 
-def generate_embedding(text: str):
-    return model.encode(text).tolist()
+# chroma (default), numpy (exact, in-process) or hnsw (approximate, in-process)
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "chroma")
 
 # -----------------------------
-# 2. Initialize ChromaDB (Local)
+# 1. Load Embedding Model
 # -----------------------------
-client = chromadb.Client(
-    Settings(persist_directory="./chroma_data")
+# Unchanged documents and repeated queries are served from ./embedding_cache
+embedder = Embedder(
+    "all-MiniLM-L6-v2",
+    cache=EmbeddingCache("all-MiniLM-L6-v2"),
 )
 
-collection = client.get_or_create_collection(name="documents")
+# -----------------------------
+# 2. Initialize Vector Store (Local)
+# -----------------------------
+if VECTOR_BACKEND == "chroma":
+    client = chromadb.Client(
+        Settings(persist_directory="./chroma_data")
+    )
+    store = ChromaStore(client.get_or_create_collection(name="documents"))
+else:
+    store = open_store(VECTOR_BACKEND, f"./{VECTOR_BACKEND}_index")
 
 # -----------------------------
 # 3. Store Documents
@@ -33,13 +44,10 @@ documents = [
 ]
 
 ids = ["doc1", "doc2", "doc3"]
-embeddings = [generate_embedding(doc) for doc in documents]
 
-collection.add(
-    documents=documents,
-    embeddings=embeddings,
-    ids=ids
-)
+# Embeds in batches and hands float32 arrays to the store as-is
+ingest(store, embedder, documents, ids)
+store.save()
 
 print("✅ Documents stored in vector database")
 
@@ -47,14 +55,13 @@ print("✅ Documents stored in vector database")
 # 4. Semantic Search
 # -----------------------------
 query = "Which database is NoSQL?"
-query_embedding = generate_embedding(query)
+query_embeddings = embedder.embed([query])
 
-results = collection.query(
-    query_embeddings=[query_embedding],
-    n_results=3
-)
+results = store.query(query_embeddings, k=3)
 
 print("\n🔍 Search Results:")
 for doc, distance in zip(results["documents"][0], results["distances"][0]):
     if distance < 0.4:  # similarity threshold
         print(f"MATCH: {doc} | score: {distance}")
+
+print(f"\n📦 Embedding cache: {embedder.cache.stats()}")
@@ -0,0 +1,365 @@
+# ==========================================
+# Day 8: Pluggable vector stores
+# ==========================================
+# One add/upsert/query/delete interface over three backends:
+#   chroma  the existing chromadb collection
+#   numpy   exact search: one contiguous float32 matrix, top-k by batched
+#           matrix multiply
+#   hnsw    approximate search with an hnswlib graph
+# Vectors are expected to be unit length (see embeddings.Embedder). Every
+# backend reports squared L2 distance, which is Chroma's default space, so
+# thresholds carry over unchanged. For unit vectors that is 2 - 2 * cos.
+# query() returns the same {"ids", "distances", "documents"} shape as
+# chromadb, with one inner list per query vector.
+
+import json
+import os
+
+import numpy as np
+
+CHROMA_BATCH_SIZE = 4096  # stays under chromadb's max add/upsert batch
+QUERY_BLOCK = 1024        # query rows per matmul, bounds the score matrix
+
+
+def _as_matrix(vectors):
+    return np.ascontiguousarray(np.atleast_2d(np.asarray(vectors, dtype=np.float32)))
+
+
+def _write_json(path, payload):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(payload, f)
+    os.replace(tmp, path)
+
+
+class VectorStore:
+    def add(self, ids, vectors, documents=None):
+        raise NotImplementedError
+
+    def upsert(self, ids, vectors, documents=None):
+        raise NotImplementedError
+
+    def query(self, vectors, k=10):
+        raise NotImplementedError
+
+    def delete(self, ids):
+        raise NotImplementedError
+
+    def save(self):
+        pass
+
+    def __len__(self):
+        raise NotImplementedError
+
+
+# -----------------------------
+# Chroma
+# -----------------------------
+class ChromaStore(VectorStore):
+    def __init__(self, collection):
+        self.collection = collection
+
+    def _write(self, method, ids, vectors, documents):
+        vectors = _as_matrix(vectors)
+        for start in range(0, len(ids), CHROMA_BATCH_SIZE):
+            end = start + CHROMA_BATCH_SIZE
+            method(
+                ids=list(ids[start:end]),
+                embeddings=vectors[start:end],
+                documents=list(documents[start:end]) if documents is not None else None,
+            )
+
+    def add(self, ids, vectors, documents=None):
+        self._write(self.collection.add, ids, vectors, documents)
+
+    def upsert(self, ids, vectors, documents=None):
+        self._write(self.collection.upsert, ids, vectors, documents)
+
+    def query(self, vectors, k=10):
+        results = self.collection.query(
+            query_embeddings=_as_matrix(vectors),
+            n_results=k,
+            include=["distances", "documents"],
+        )
+        return {
+            "ids": results["ids"],
+            "distances": results["distances"],
+            "documents": results["documents"],
+        }
+
+    def delete(self, ids):
+        self.collection.delete(ids=list(ids))
+
+    def __len__(self):
+        return self.collection.count()
+
+
+# -----------------------------
+# NumPy brute force
+# -----------------------------
+class NumpyStore(VectorStore):
+    """Exact search over a contiguous matrix; persisted as .npy + .json."""
+
+    def __init__(self, path=None, dim=None):
+        self.path = path
+        self.dim = dim
+        self._matrix = np.empty((0, dim or 0), dtype=np.float32)
+        self._ids = []
+        self._documents = []
+        self._rows = {}
+        if path and os.path.exists(os.path.join(path, "vectors.npy")):
+            self._load()
+
+    def _load(self):
+        self._matrix = np.load(os.path.join(self.path, "vectors.npy"))
+        with open(os.path.join(self.path, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        self.dim = self._matrix.shape[1]
+        self._ids = meta["ids"]
+        self._documents = meta["documents"]
+        self._rows = {doc_id: row for row, doc_id in enumerate(self._ids)}
+
+    def save(self):
+        os.makedirs(self.path, exist_ok=True)
+        np.save(os.path.join(self.path, "vectors.npy"), self._matrix[: len(self._ids)])
+        _write_json(os.path.join(self.path, "meta.json"), {"ids": self._ids, "documents": self._documents})
+
+    def _reserve(self, extra):
+        needed = len(self._ids) + extra
+        if needed <= len(self._matrix):
+            return
+        capacity = max(needed, 2 * len(self._matrix), 1024)
+        grown = np.empty((capacity, self.dim), dtype=np.float32)
+        grown[: len(self._ids)] = self._matrix[: len(self._ids)]
+        self._matrix = grown
+
+    def _write(self, ids, vectors, documents, replace):
+        vectors = _as_matrix(vectors)
+        if self.dim is None:
+            self.dim = vectors.shape[1]
+            self._matrix = np.empty((0, self.dim), dtype=np.float32)
+        documents = documents if documents is not None else [None] * len(ids)
+        # Last occurrence wins when an id repeats within one call.
+        rows = {doc_id: row for row, doc_id in enumerate(ids)}
+        if not replace:
+            for doc_id in rows:
+                if doc_id in self._rows:
+                    raise ValueError(f"id {doc_id!r} already exists")
+
+        self._reserve(len(rows))
+        for doc_id, source in rows.items():
+            row = self._rows.get(doc_id)
+            if row is None:
+                row = len(self._ids)
+                self._rows[doc_id] = row
+                self._ids.append(doc_id)
+                self._documents.append(documents[source])
+            else:
+                self._documents[row] = documents[source]
+            self._matrix[row] = vectors[source]
+
+    def add(self, ids, vectors, documents=None):
+        self._write(ids, vectors, documents, replace=False)
+
+    def upsert(self, ids, vectors, documents=None):
+        self._write(ids, vectors, documents, replace=True)
+
+    def delete(self, ids):
+        # Swap each deleted row with the last live row to keep the matrix dense
+        for doc_id in ids:
+            row = self._rows.pop(doc_id, None)
+            if row is None:
+                continue
+            last = len(self._ids) - 1
+            if row != last:
+                self._matrix[row] = self._matrix[last]
+                self._ids[row] = self._ids[last]
+                self._documents[row] = self._documents[last]
+                self._rows[self._ids[row]] = row
+            self._ids.pop()
+            self._documents.pop()
+
+    def query(self, vectors, k=10):
+        queries = _as_matrix(vectors)
+        count = len(self._ids)
+        out = {"ids": [], "distances": [], "documents": []}
+        if count == 0:
+            return {key: [[] for _ in queries] for key in out}
+        k = min(k, count)
+        corpus = self._matrix[:count]
+        for start in range(0, len(queries), QUERY_BLOCK):
+            scores = queries[start : start + QUERY_BLOCK] @ corpus.T
+            if k < count:
+                top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            else:
+                top = np.broadcast_to(np.arange(count), (len(scores), count))
+            top_scores = np.take_along_axis(scores, top, axis=1)
+            order = np.argsort(-top_scores, axis=1)
+            top = np.take_along_axis(top, order, axis=1)
+            distances = 2.0 - 2.0 * np.take_along_axis(top_scores, order, axis=1)
+            for rows, dist in zip(top, distances):
+                out["ids"].append([self._ids[r] for r in rows])
+                out["distances"].append(dist.tolist())
+                out["documents"].append([self._documents[r] for r in rows])
+        return out
+
+    @property
+    def nbytes(self):
+        return self._matrix.nbytes
+
+    def __len__(self):
+        return len(self._ids)
+
+
+# -----------------------------
+# HNSW
+# -----------------------------
+class HNSWStore(VectorStore):
+    """Approximate search with hnswlib; persisted as index.bin + meta.json."""
+
+    def __init__(self, path=None, dim=None, m=16, ef_construction=200, ef_search=64, capacity=1024):
+        import hnswlib
+
+        self._hnswlib = hnswlib
+        self.path = path
+        self.dim = dim
+        self.m = m
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self._index = None
+        self._capacity = capacity
+        self._labels = {}     # id -> hnsw label
+        self._ids = {}        # hnsw label -> id
+        self._documents = {}  # hnsw label -> document
+        self._next_label = 0
+        self._free_slots = 0  # deleted slots awaiting reuse
+        if path and os.path.exists(os.path.join(path, "index.bin")):
+            self._load()
+
+    def _create(self, dim):
+        self.dim = dim
+        self._index = self._hnswlib.Index(space="l2", dim=dim)
+        self._index.init_index(
+            max_elements=self._capacity,
+            ef_construction=self.ef_construction,
+            M=self.m,
+            allow_replace_deleted=True,
+        )
+        self._index.set_ef(self.ef_search)
+
+    def _load(self):
+        with open(os.path.join(self.path, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        self.dim = meta["dim"]
+        self._next_label = meta["next_label"]
+        self._labels = dict(meta["labels"])
+        self._ids = {label: doc_id for doc_id, label in self._labels.items()}
+        self._documents = {int(label): doc for label, doc in meta["documents"].items()}
+        self._index = self._hnswlib.Index(space="l2", dim=self.dim)
+        self._index.load_index(os.path.join(self.path, "index.bin"), allow_replace_deleted=True)
+        self._capacity = self._index.get_max_elements()
+        self._free_slots = self._index.get_current_count() - len(self._labels)
+        self._index.set_ef(self.ef_search)
+
+    def save(self):
+        if self._index is None:
+            return  # nothing has been written yet
+        os.makedirs(self.path, exist_ok=True)
+        self._index.save_index(os.path.join(self.path, "index.bin"))
+        _write_json(
+            os.path.join(self.path, "meta.json"),
+            {
+                "dim": self.dim,
+                "next_label": self._next_label,
+                "labels": list(self._labels.items()),
+                "documents": self._documents,
+            },
+        )
+
+    def _write(self, ids, vectors, documents, replace):
+        vectors = _as_matrix(vectors)
+        if self._index is None:
+            self._create(vectors.shape[1])
+        documents = documents if documents is not None else [None] * len(ids)
+        # Last occurrence wins when an id repeats within one call.
+        rows = {doc_id: row for row, doc_id in enumerate(ids)}
+        if not replace:
+            for doc_id in rows:
+                if doc_id in self._labels:
+                    raise ValueError(f"id {doc_id!r} already exists")
+
+        existing_rows, existing_labels, new_rows, new_labels = [], [], [], []
+        for doc_id, row in rows.items():
+            label = self._labels.get(doc_id)
+            if label is None:
+                label = self._next_label
+                self._next_label += 1
+                self._labels[doc_id] = label
+                self._ids[label] = doc_id
+                new_rows.append(row)
+                new_labels.append(label)
+            else:
+                existing_rows.append(row)
+                existing_labels.append(label)
+            self._documents[label] = documents[row]
+
+        if existing_rows:
+            # Re-adding a live label updates its vector in place.
+            self._index.add_items(vectors[existing_rows], np.asarray(existing_labels, dtype=np.int64))
+        if new_rows:
+            # New labels take over slots freed by delete() before growing.
+            reused = min(len(new_rows), self._free_slots)
+            needed = self._index.get_current_count() + len(new_rows) - reused
+            if needed > self._capacity:
+                self._capacity = max(needed, 2 * self._capacity)
+                self._index.resize_index(self._capacity)
+            self._index.add_items(
+                vectors[new_rows], np.asarray(new_labels, dtype=np.int64), replace_deleted=True
+            )
+            self._free_slots -= reused
+
+    def add(self, ids, vectors, documents=None):
+        self._write(ids, vectors, documents, replace=False)
+
+    def upsert(self, ids, vectors, documents=None):
+        self._write(ids, vectors, documents, replace=True)
+
+    def delete(self, ids):
+        for doc_id in ids:
+            label = self._labels.pop(doc_id, None)
+            if label is None:
+                continue
+            self._index.mark_deleted(label)
+            self._free_slots += 1
+            del self._ids[label]
+            del self._documents[label]
+
+    def query(self, vectors, k=10):
+        out = {"ids": [], "distances": [], "documents": []}
+        k = min(k, len(self))
+        if k == 0:
+            queries = _as_matrix(vectors)
+            return {key: [[] for _ in queries] for key in out}
+        self._index.set_ef(max(self.ef_search, k))
+        labels, distances = self._index.knn_query(_as_matrix(vectors), k=k)
+        for row_labels, row_distances in zip(labels, distances):
+            out["ids"].append([self._ids[int(label)] for label in row_labels])
+            out["distances"].append(row_distances.tolist())
+            out["documents"].append([self._documents[int(label)] for label in row_labels])
+        return out
+
+    def __len__(self):
+        return len(self._labels)
+
+
+def open_store(backend, path, collection_name="documents", dim=None):
+    if backend == "numpy":
+        return NumpyStore(path, dim)
+    if backend == "hnsw":
+        return HNSWStore(path, dim)
+    if backend == "chroma":
+        import chromadb
+
+        client = chromadb.PersistentClient(path=path)
+        return ChromaStore(client.get_or_create_collection(name=collection_name))
+    raise ValueError(f"unknown vector store backend: {backend!r}")